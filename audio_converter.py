@@ -3,30 +3,101 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import sys
 from pydub import AudioSegment
-from pydub.utils import which
 import re
+from batch_journal import BatchJournal, atomic_outputs, open_journal, unique_output_name
+from conversion_cache import open_cache, store_in_cache
+from file_list import VirtualFileList
+from job_scheduler import JobScheduler
+from audio_processing import AudioOperation, Downmix, FadeIn, FadeOut, Gain, Limit, Normalize, stream_process_audio
+from probe_cache import probe_file, probe_files
+from ffmpeg_tools import AUDIO_OUTPUT_ARGS, can_copy_audio, fan_out_audio, find_ffmpeg
+from concurrent.futures import ThreadPoolExecutor
 
-class AudioConverter:
-    def __init__(self, root, main_root):
 
-        if getattr(sys, 'frozen', False):
-            bundle_dir = sys._MEIPASS
+def get_export_settings(target_format):
+    """Get the pydub export arguments (container, codec, ffmpeg parameters) for a target format"""
+    if target_format == "aac":
+        return {"format": "adts", "codec": "aac"}  # AAC in ADTS container
+    if target_format == "m4a":
+        return {"format": "ipod", "codec": "aac"}  # AAC in MP4 container
+    if target_format == "wma":
+        return {"format": "asf", "codec": "wmav2"}  # Windows Media Audio
+    if target_format == "flac":
+        # Set higher quality for FLAC
+        return {"format": "flac", "codec": "flac", "parameters": ["-compression_level", "8"]}
+    # Default handling for other formats
+    return {"format": target_format}
+
+
+def convert_audio_outputs(input_path, outputs, operations=None, ffmpeg_path=None, allow_copy=True,
+                          threads=None):
+    """Convert one audio (or video) file to several audio formats from a single decode
+
+    outputs is a list of (target_format, output_file). Formats the input's
+    audio codec already fits get the stream copied without re-encoding.
+    The others are transcoded by one streaming ffmpeg process that feeds
+    every encoder, so memory use does not grow with duration.
+    Sample-level operations (see audio_processing) run as NumPy code on
+    chunks streamed between two ffmpeg pipes. Plain AudioSegment ->
+    AudioSegment callables still go through pydub, with the whole
+    recording in memory.
+    threads limits ffmpeg's threads when several files convert at once.
+    Outputs are written under temporary names and renamed once complete.
+    Returns {target_format: "copied" or "transcoded"}.
+    """
+    with atomic_outputs([output_file for fmt, output_file in outputs]) as temp_files:
+        outputs = [(fmt, temp_file) for (fmt, output_file), temp_file in zip(outputs, temp_files)]
+        if not operations:
+            copy_formats = set()
+            if allow_copy:
+                try:
+                    info = probe_file(input_path, ffmpeg_path)
+                except Exception:
+                    info = None  # Let the transcode below report the real problem
+                if info:
+                    copy_formats = {fmt for fmt, output_file in outputs if can_copy_audio(info, fmt)}
+            fan_out_audio(input_path, outputs, copy_formats, ffmpeg_path, threads)
+            return {fmt: "copied" if fmt in copy_formats else "transcoded" for fmt, output_file in outputs}
+        
+        if all(isinstance(operation, AudioOperation) for operation in operations):
+            stream_process_audio(input_path, outputs, operations, ffmpeg_path)
         else:
-            bundle_dir = os.path.dirname(os.path.abspath(__file__))
-    
-        ffmpeg_path = os.path.join(bundle_dir, "ffmpeg.exe")
-        if os.path.isfile(ffmpeg_path):
-            AudioSegment.converter = ffmpeg_path
+            audio = AudioSegment.from_file(input_path)
+            for operation in operations:
+                audio = operation(audio)
+            for target_format, output_file in outputs:
+                audio.export(output_file, **get_export_settings(target_format))
+        return {fmt: "transcoded" for fmt, output_file in outputs}
+
+
+def convert_audio_file(input_path, output_file, target_format, operations=None, ffmpeg_path=None,
+                       allow_copy=True, threads=None):
+    """Convert one audio (or video) file to an audio format; returns "copied" or "transcoded"
+
+    See convert_audio_outputs for how the conversion is done.
+    """
+    methods = convert_audio_outputs(
+        input_path, [(target_format, output_file)], operations, ffmpeg_path, allow_copy, threads
+    )
+    return methods[target_format]
+
+
+class AudioConverter:
+    def __init__(self, root, main_root):
+        # Prefer the bundled ffmpeg.exe, then ffmpeg on the PATH
+        self.ffmpeg_path = find_ffmpeg()
+        if self.ffmpeg_path:
+            AudioSegment.converter = self.ffmpeg_path
 
         self.root = root
         self.main_root = main_root
         self.root.title("Audio Converter")
-        self.root.geometry("700x650")
+        self.root.geometry("700x700")
         self.center_window()
         self.set_app_icon()
         
         # Verify FFmpeg installation
-        if not which("ffmpeg"):
+        if not self.ffmpeg_path:
             messagebox.showerror(
                 "FFmpeg Missing",
                 "FFmpeg is required for audio conversion. Please install FFmpeg and add it to your PATH."
@@ -48,11 +119,17 @@ class AudioConverter:
             ("WMA", "wma"),
             ("FLAC", "flac")
         ]
+        self.gains = ["0", "+6", "+3", "-3", "-6", "-12"]
+        self.fade_lengths = ["0", "1", "2", "5", "10"]
         self.input_paths = []
         self.output_path = ""
-        self.MAX_FILES = 20
+        self.scheduler = None
+        self.journal = None
+        # Reads stream metadata of new selections in the background
+        self.probe_executor = ThreadPoolExecutor(max_workers=1)
         
         self.create_widgets()
+        self.root.bind("<Destroy>", self.on_destroy)
     
     def center_window(self):
         """Center the window on screen"""
@@ -128,19 +205,18 @@ class AudioConverter:
         self.source_combo.current(0)
         self.source_combo.pack(side=tk.LEFT, padx=5)
         
-        # Target format selection
-        ttk.Label(conversion_frame, text="Convert to:").pack(side=tk.LEFT, padx=(5, 0))
-        self.target_format_var = tk.StringVar()
-        target_names = [fmt[0] for fmt in self.target_formats]
-        self.target_combo = ttk.Combobox(
-            conversion_frame,
-            textvariable=self.target_format_var,
-            values=target_names,
-            state="readonly",
-            width=15
-        )
-        self.target_combo.current(1)
-        self.target_combo.pack(side=tk.LEFT, padx=5)
+        # Target format selection; every checked format is written from a single decode
+        targets_frame = ttk.Frame(format_frame)
+        targets_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(targets_frame, text="Convert to:").pack(side=tk.LEFT)
+        self.target_format_vars = {}
+        for display_name, extension in self.target_formats:
+            self.target_format_vars[extension] = tk.BooleanVar(value=extension == "wav")
+            ttk.Checkbutton(
+                targets_frame,
+                text=display_name,
+                variable=self.target_format_vars[extension]
+            ).pack(side=tk.LEFT, padx=(5, 0))
         
         # Input section
         input_frame = ttk.LabelFrame(main_frame, text="STEP 2: SELECT FILES", style="Section.TFrame")
@@ -158,25 +234,13 @@ class AudioConverter:
         preview_frame = ttk.Frame(input_frame)
         preview_frame.pack(fill=tk.X, pady=(5, 10))
         
-        # Create container for preview with scrollable canvas
-        preview_container = ttk.Frame(preview_frame)
-        preview_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create canvas with scrollbar
-        self.canvas = tk.Canvas(preview_container, bg="#f0f0f0", height=150)
-        scrollbar = ttk.Scrollbar(preview_container, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas, style="Preview.TFrame")
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Virtualized file list; only the visible rows have widgets
+        self.file_list = VirtualFileList(
+            preview_frame,
+            on_remove=self.remove_file,
+            placeholder="No files selected. Click 'Browse Files' to add files."
         )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.file_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Selected files label
         self.files_label = ttk.Label(
@@ -236,14 +300,94 @@ class AudioConverter:
         )
         self.folder_entry.pack(side=tk.LEFT, padx=5)
         
-        # Convert button
+        # Reuse results of earlier identical conversions
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            folder_frame,
+            text="Reuse cached results",
+            variable=self.use_cache_var
+        ).pack(side=tk.RIGHT)
+        
+        # Sample-level processing, streamed in chunks so long recordings fit in memory
+        processing_frame = ttk.Frame(output_frame)
+        processing_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        ttk.Label(processing_frame, text="Gain (dB):").pack(side=tk.LEFT)
+        self.gain_var = tk.StringVar()
+        gain_combo = ttk.Combobox(
+            processing_frame,
+            textvariable=self.gain_var,
+            values=self.gains,
+            state="readonly",
+            width=5
+        )
+        gain_combo.current(0)
+        gain_combo.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(processing_frame, text="Fade in (s):").pack(side=tk.LEFT, padx=(10, 0))
+        self.fade_in_var = tk.StringVar()
+        fade_in_combo = ttk.Combobox(
+            processing_frame,
+            textvariable=self.fade_in_var,
+            values=self.fade_lengths,
+            state="readonly",
+            width=4
+        )
+        fade_in_combo.current(0)
+        fade_in_combo.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(processing_frame, text="Fade out (s):").pack(side=tk.LEFT, padx=(10, 0))
+        self.fade_out_var = tk.StringVar()
+        fade_out_combo = ttk.Combobox(
+            processing_frame,
+            textvariable=self.fade_out_var,
+            values=self.fade_lengths,
+            state="readonly",
+            width=4
+        )
+        fade_out_combo.current(0)
+        fade_out_combo.pack(side=tk.LEFT, padx=5)
+        
+        self.downmix_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            processing_frame,
+            text="Mono",
+            variable=self.downmix_var
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Loudness: normalize the peak and keep gain changes from clipping
+        self.normalize_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            processing_frame,
+            text="Normalize",
+            variable=self.normalize_var
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.limit_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            processing_frame,
+            text="Limit peaks",
+            variable=self.limit_var
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Convert and resume buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=20)
         self.convert_btn = ttk.Button(
-            main_frame,
+            button_frame,
             text="CONVERT",
             command=self.convert_files,
             state="disabled"
         )
-        self.convert_btn.pack(pady=20)
+        self.convert_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Continues the last batch that was interrupted, skipping finished files
+        self.resume_btn = ttk.Button(
+            button_frame,
+            text="RESUME",
+            command=self.resume_batch
+        )
+        self.resume_btn.pack(side=tk.LEFT, padx=5)
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -256,6 +400,14 @@ class AudioConverter:
         )
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
     
+    def on_destroy(self, event):
+        """Stop queued conversions and metadata reads when the window is closed"""
+        if event.widget is not self.root:
+            return
+        self.probe_executor.shutdown(wait=False, cancel_futures=True)
+        if self.scheduler:
+            self.scheduler.cancel()
+    
     def navigate(self, converter_name):
         if converter_name == "Main Menu":
             self.root.destroy()
@@ -329,16 +481,8 @@ class AudioConverter:
             )
             return
             
-        # Add new files to existing selection
-        new_paths = list(set(self.input_paths + valid_paths))
-        
-        # Limit to MAX_FILES
-        if len(new_paths) > self.MAX_FILES:
-            new_paths = new_paths[:self.MAX_FILES]
-            messagebox.showwarning(
-                "File Limit", 
-                f"Maximum {self.MAX_FILES} files allowed. Only first {self.MAX_FILES} will be processed."
-            )
+        # Add new files to existing selection, keeping the original order
+        new_paths = list(dict.fromkeys(self.input_paths + valid_paths))
         
         self.input_paths = new_paths
         self.process_files()
@@ -355,81 +499,20 @@ class AudioConverter:
             
             # Show previews for all files
             self.show_previews()
+            self.warm_probe_cache()
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not load files:\n{str(e)}")
             self.status_var.set(f"Error loading files: {str(e)}")
     
-    def clear_previews(self):
-        """Clear existing previews"""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-    
     def show_previews(self):
-        """Display preview for all files with remove buttons"""
-        try:
-            # Clear existing previews
-            self.clear_previews()
-            
-            # Only show if there are files
-            if not self.input_paths:
-                # Add placeholder text when no files
-                placeholder = ttk.Label(
-                    self.scrollable_frame,
-                    text="No files selected. Click 'Browse Files' to add files.",
-                    foreground="#888888",
-                    font=("Arial", 9)
-                )
-                placeholder.pack(pady=20)
-                return
-            
-            # Configure for file list
-            for i, file_path in enumerate(self.input_paths):
-                # Create file container
-                file_frame = ttk.Frame(
-                    self.scrollable_frame,
-                    padding=5,
-                    relief="groove",
-                    borderwidth=1
-                )
-                file_frame.pack(fill=tk.X, padx=5, pady=2)
-                file_frame.file_path = file_path  # Store file path in frame
-                
-                # Filename with remove button
-                filename = os.path.basename(file_path)
-                
-                # Filename and remove button container
-                bottom_frame = ttk.Frame(file_frame)
-                bottom_frame.pack(fill=tk.X, expand=True)
-                
-                # Filename label
-                ttk.Label(
-                    bottom_frame,
-                    text=filename,
-                    width=50,
-                    anchor=tk.W
-                ).pack(side=tk.LEFT, padx=(0, 5))
-                
-                # Remove button
-                remove_btn = ttk.Button(
-                    bottom_frame,
-                    text="X",
-                    width=6,
-                    command=lambda f=file_path: self.remove_file(f)
-                )
-                remove_btn.pack(side=tk.RIGHT)
-            
-            # Update canvas scroll region
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            
-        except Exception as e:
-            # Create error label if preview fails
-            error_label = ttk.Label(
-                self.scrollable_frame,
-                text=f"Preview Error: {str(e)}",
-                foreground="red"
-            )
-            error_label.pack()
+        """Show the selected files in the file list"""
+        self.file_list.set_items(self.input_paths)
+    
+    def warm_probe_cache(self):
+        """Probe the selection in the background so a batch can be scheduled at once"""
+        if self.input_paths:
+            self.probe_executor.submit(probe_files, list(self.input_paths), self.ffmpeg_path)
     
     def remove_file(self, file_path):
         """Remove a specific file from the selection"""
@@ -445,18 +528,96 @@ class AudioConverter:
             self.path_var.set(path)
             self.status_var.set(f"Output path set to: {path}")
     
-    def get_format_extension(self, display_name):
-        """Get file extension from display name"""
-        for fmt in self.target_formats:
-            if fmt[0] == display_name:
-                return fmt[1]
-        return display_name.lower()
+    def get_target_formats(self):
+        """Get the file extensions of every checked target format"""
+        return [fmt[1] for fmt in self.target_formats if self.target_format_vars[fmt[1]].get()]
+    
+    def get_operations(self):
+        """Build the selected sample-level operations (empty for a plain conversion)"""
+        operations = []
+        # Downmix first so the rest of the chain works on fewer samples
+        if self.downmix_var.get():
+            operations.append(Downmix())
+        if self.normalize_var.get():
+            operations.append(Normalize())
+        gain = float(self.gain_var.get())
+        if gain:
+            operations.append(Gain(gain))
+        if self.limit_var.get():
+            operations.append(Limit())
+        fade_in = int(self.fade_in_var.get())
+        if fade_in:
+            operations.append(FadeIn(fade_in * 1000))
+        fade_out = int(self.fade_out_var.get())
+        if fade_out:
+            operations.append(FadeOut(fade_out * 1000))
+        return operations
+    
+    def get_settings(self):
+        """Current conversion settings, stored in the batch journal"""
+        return {
+            "source_format": self.source_format_var.get(),
+            "target_formats": self.get_target_formats(),
+            "output_path": self.output_path,
+            "create_folder": self.create_folder_var.get(),
+            "folder_name": self.folder_var.get(),
+            "use_cache": self.use_cache_var.get(),
+            "gain": self.gain_var.get(),
+            "fade_in": self.fade_in_var.get(),
+            "fade_out": self.fade_out_var.get(),
+            "downmix": self.downmix_var.get(),
+            "normalize": self.normalize_var.get(),
+            "limit": self.limit_var.get(),
+        }
+    
+    def apply_settings(self, settings):
+        """Restore the settings of a journaled batch"""
+        self.source_format_var.set(settings["source_format"])
+        for extension, var in self.target_format_vars.items():
+            var.set(extension in settings["target_formats"])
+        self.output_path = settings["output_path"]
+        self.path_var.set(self.output_path)
+        self.create_folder_var.set(settings["create_folder"])
+        self.folder_var.set(settings["folder_name"])
+        self.toggle_folder_entry()
+        self.use_cache_var.set(settings["use_cache"])
+        self.gain_var.set(settings["gain"])
+        self.fade_in_var.set(settings["fade_in"])
+        self.fade_out_var.set(settings["fade_out"])
+        self.downmix_var.set(settings["downmix"])
+        self.normalize_var.set(settings["normalize"])
+        self.limit_var.set(settings["limit"])
+    
+    def resume_batch(self):
+        """Continue the last interrupted batch with its settings, skipping finished files"""
+        if self.scheduler:
+            return
+        journal = BatchJournal.latest("audio")
+        if journal is None:
+            messagebox.showinfo("Resume", "There is no interrupted audio batch to resume.")
+            return
+        
+        if not messagebox.askyesno(
+            "Resume",
+            f"Resume the batch of {len(journal.inputs)} files started {journal.started()}?\n\n"
+            f"{journal.completed_count()} files are already converted and will be skipped."
+        ):
+            return
+        
+        try:
+            self.apply_settings(journal.settings)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not restore the batch settings:\n{str(e)}")
+            return
+        self.input_paths = list(journal.inputs)
+        self.process_files()
+        self.convert_files(journal)
     
     def sanitize_filename(self, filename):
         """Remove invalid characters from filename"""
         return re.sub(r'[<>:"/\\|?*]', '', filename)
     
-    def convert_files(self):
+    def convert_files(self, journal=None):
         if not self.input_paths:
             messagebox.showerror("Error", "No files selected!")
             return
@@ -465,13 +626,11 @@ class AudioConverter:
             messagebox.showerror("Error", "Please select an output folder!")
             return
         
-        target_display = self.target_format_var.get()
-        if not target_display:
+        target_formats = self.get_target_formats()
+        if not target_formats:
             messagebox.showerror("Error", "Please select target format!")
             return
-        
-        # Get actual file extension
-        target_format = self.get_format_extension(target_display)
+        target_display = ", ".join(fmt.upper() for fmt in target_formats)
         
         # Determine output directory
         if self.create_folder_var.get():
@@ -485,58 +644,142 @@ class AudioConverter:
             os.makedirs(output_dir)
             self.status_var.set(f"Created folder: {folder_name}")
         
-        # Convert files
-        success_count = 0
-        error_count = 0
-        total_files = len(self.input_paths)
+        operations = self.get_operations()
+        use_cache = self.use_cache_var.get()
+        # The journal records finished files so an interrupted batch can be resumed
+        self.journal = journal or open_journal("audio", self.get_settings(), self.input_paths)
+        self.batch = {
+            "total": len(self.input_paths),
+            "success": 0,
+            "errors": 0,
+            "cached": 0,
+            "copied": 0,
+            "transcoded": 0,
+            "resumed": 0,
+            "target_display": target_display,
+            "output_dir": output_dir,
+            "files": {},
+            "outputs": {},
+        }
         
-        for i, input_path in enumerate(self.input_paths):
-            # Sanitize filename and create output path
+        to_convert = []
+        taken_names = set()
+        for input_path in self.input_paths:
+            # Sanitize filename; inputs with the same name from different folders
+            # are numbered, in input order so a resumed batch names them the same
             base_name = os.path.splitext(os.path.basename(input_path))[0]
-            clean_name = self.sanitize_filename(base_name)
-            output_file = os.path.join(output_dir, f"{clean_name}.{target_format}")
+            clean_name = unique_output_name(self.sanitize_filename(base_name), taken_names)
             
-            self.status_var.set(f"Converting {i+1}/{total_files}: {base_name}")
-            self.root.update()
+            # Files whose outputs were verified by the journal are not converted again
+            if self.journal and self.journal.is_complete(input_path):
+                self.batch["success"] += 1
+                self.batch["resumed"] += 1
+                continue
             
+            # One output path per format
+            files = [os.path.join(output_dir, f"{clean_name}.{fmt}") for fmt in target_formats]
+            self.batch["files"][input_path] = files
+            self.batch["outputs"][input_path] = list(zip(target_formats, files))
+            to_convert.append(input_path)
+        
+        if not to_convert:
+            self.finish_conversion()
+            return
+        
+        def cache_options(target_format):
+            return {
+                "ffmpeg": AUDIO_OUTPUT_ARGS[target_format],
+                "stream_copy": True,
+                "operations": [repr(operation) for operation in operations],
+            }
+        
+        # Run several ffmpeg processes at once, longest files first
+        def run_job(input_path, threads):
+            # Hashing for the cache key reads the whole input, so it runs here and not on the Tk thread
+            cache = open_cache() if use_cache else None
             try:
-                # Load file
-                audio = AudioSegment.from_file(input_path)
-                
-                # Handle special formats
-                if target_format == "aac":
-                    audio.export(output_file, format="adts", codec="aac")  # AAC in ADTS container
-                elif target_format == "m4a":
-                    audio.export(output_file, format="ipod", codec="aac")   # AAC in MP4 container
-                elif target_format == "wma":
-                    audio.export(output_file, format="asf", codec="wmav2")  # Windows Media Audio
-                elif target_format == "flac":
-                    # Set higher quality for FLAC
-                    audio.export(output_file, format="flac", codec="flac", 
-                                parameters=["-compression_level", "8"])
-                else:
-                    # Default handling for other formats
-                    audio.export(output_file, format=target_format)
+                methods = {}
+                missing = []
+                cache_keys = {}
+                for target_format, output_file in self.batch["outputs"][input_path]:
+                    if cache:
+                        key = cache.make_key(input_path, target_format, cache_options(target_format))
+                        cache_keys[target_format] = key
+                        if cache.fetch(key, output_file):
+                            methods[target_format] = "cached"
+                            continue
+                    missing.append((target_format, output_file))
                 
-                success_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                self.status_var.set(f"Error converting {base_name}: {str(e)}")
-                # Log detailed error
-                with open("conversion_errors.log", "a") as log_file:
-                    log_file.write(f"Error converting {input_path} to {target_format}: {str(e)}\n")
+                # Only the formats that were not cached are converted
+                if missing:
+                    methods.update(convert_audio_outputs(
+                        input_path, missing, operations, ffmpeg_path=self.ffmpeg_path, threads=threads
+                    ))
+                    if cache:
+                        for target_format, output_file in missing:
+                            store_in_cache(cache, cache_keys[target_format], output_file)
+                return methods
+            finally:
+                if cache:
+                    cache.close()
+        
+        self.scheduler = JobScheduler(
+            self.root, run_job, self.on_job_result, self.finish_conversion, ffmpeg_path=self.ffmpeg_path
+        )
+        self.convert_btn.config(state="disabled")
+        self.status_var.set(f"Reading durations of {len(to_convert)} files...")
+        self.scheduler.start(to_convert)
+    
+    def on_job_result(self, input_path, methods, error):
+        """Record one finished file and show it in the status bar"""
+        batch = self.batch
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        if error is not None:
+            batch["errors"] += 1
+            self.status_var.set(f"Error converting {base_name}: {str(error)}")
+            # Log detailed error
+            with open("conversion_errors.log", "a") as log_file:
+                log_file.write(f"Error converting {input_path} to {batch['target_display']}: {str(error)}\n")
+            if self.journal:
+                self.journal.mark_failed(input_path, error)
+            return
+        
+        batch["success"] += 1
+        for target_format, output_file in batch["outputs"][input_path]:
+            batch[methods[target_format]] += 1
+        if self.journal:
+            self.journal.mark_done(input_path, batch["files"][input_path])
+        
+        # e.g. "MP3 copied, FLAC transcoded"
+        done = batch["success"] + batch["errors"]
+        running = self.scheduler.running() if self.scheduler else 0
+        summary = ", ".join(f"{fmt.upper()} {method}" for fmt, method in methods.items())
+        self.status_var.set(f"Done {done}/{batch['total']}: {base_name} - {summary} ({running} running)")
+    
+    def finish_conversion(self):
+        """Show the batch summary"""
+        batch = self.batch
+        self.scheduler = None
+        # Keep the journal of a batch with errors so Resume retries just the failed files
+        if self.journal and not batch["errors"]:
+            self.journal.finish()
+        self.journal = None
+        self.convert_btn.config(state="normal" if self.input_paths else "disabled")
         
         # Show summary
         source_type = "video" if self.source_format_var.get() == "VIDEO (Extract Audio)" else "audio"
         messagebox.showinfo(
             "Conversion Complete", 
-            f"Processed {total_files} {source_type} files\n\n"
-            f"Success: {success_count}\n"
-            f"Errors: {error_count}\n\n"
-            f"Files saved to: {output_dir}\n\n"
+            f"Processed {batch['total']} {source_type} files to {batch['target_display']}\n\n"
+            f"Success: {batch['success']}\n"
+            f"Errors: {batch['errors']}\n\n"
+            f"Output files stream copied: {batch['copied']}\n"
+            f"Output files transcoded: {batch['transcoded']}\n"
+            f"Output files reused from cache: {batch['cached']}\n"
+            f"Files already converted before resuming: {batch['resumed']}\n\n"
+            f"Files saved to: {batch['output_dir']}\n\n"
             "You can convert the same files again or remove them individually."
         )
         
         # Update status
-        self.status_var.set(f"Converted {success_count} files to {target_display}")
\ No newline at end of file
+        self.status_var.set(f"Converted {batch['success']} files to {batch['target_display']}")
\ No newline at end of file
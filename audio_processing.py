@@ -0,0 +1,335 @@
+import subprocess
+import tempfile
+
+import numpy as np
+
+from ffmpeg_tools import AUDIO_OUTPUT_ARGS, FFmpegError, find_ffmpeg, first_stream, stderr_tail
+from probe_cache import probe_file
+
+# Samples travel through the ffmpeg pipes as 32-bit float PCM, so gain
+# changes cannot clip before the encoder and no conversion is needed
+SAMPLE_FORMAT = "f32le"
+SAMPLE_WIDTH = 4
+
+# Frames per chunk (about 1.4 seconds at 48 kHz)
+CHUNK_FRAMES = 65536
+
+
+def db_to_scale(db):
+    return 10 ** (db / 20)
+
+
+class AudioOperation:
+    """Vectorized sample-level operation on float32 PCM
+
+    process(samples, position, rate) gets a (frames, channels) chunk that
+    starts position frames into the recording. It works in place and
+    returns the processed chunk: the same array, or a buffer the operation
+    owns and reuses for every chunk.
+    """
+
+    # Operations that need the peak of the whole recording get it from a measuring pass
+    needs_peak = False
+
+    def process(self, samples, position, rate):
+        raise NotImplementedError
+
+    def output_channels(self, channels):
+        return channels
+
+
+class Gain(AudioOperation):
+    """Change the volume by a number of dB"""
+
+    def __init__(self, db):
+        self.db = db
+        self.scale = np.float32(db_to_scale(db))
+
+    def __repr__(self):
+        return f"Gain({self.db})"
+
+    def process(self, samples, position, rate):
+        samples *= self.scale
+        return samples
+
+
+class Normalize(AudioOperation):
+    """Scale the recording so its highest peak reaches target_db"""
+
+    needs_peak = True
+
+    def __init__(self, target_db=-1.0):
+        self.target_db = target_db
+        self.scale = np.float32(1)
+
+    def __repr__(self):
+        return f"Normalize({self.target_db})"
+
+    def set_peak(self, peak):
+        self.scale = np.float32(db_to_scale(self.target_db) / peak if peak > 0 else 1)
+
+    def process(self, samples, position, rate):
+        samples *= self.scale
+        return samples
+
+
+class Limit(AudioOperation):
+    """Hard-limit peaks to ceiling_db"""
+
+    def __init__(self, ceiling_db=-1.0):
+        self.ceiling_db = ceiling_db
+        self.ceiling = np.float32(db_to_scale(ceiling_db))
+
+    def __repr__(self):
+        return f"Limit({self.ceiling_db})"
+
+    def process(self, samples, position, rate):
+        np.clip(samples, -self.ceiling, self.ceiling, out=samples)
+        return samples
+
+
+class FadeIn(AudioOperation):
+    """Fade in from silence over the first duration_ms"""
+
+    def __init__(self, duration_ms):
+        self.duration_ms = duration_ms
+
+    def __repr__(self):
+        return f"FadeIn({self.duration_ms})"
+
+    def process(self, samples, position, rate):
+        length = int(self.duration_ms * rate / 1000)
+        if position >= length:
+            return samples
+
+        # Linear ramp; each chunk covers its own part of it
+        count = min(len(samples), length - position)
+        ramp = np.arange(position, position + count, dtype=np.float32)
+        ramp /= length
+        samples[:count] *= ramp[:, None]
+        return samples
+
+
+class FadeOut(AudioOperation):
+    """Fade out to silence over the last duration_ms
+
+    When streaming, the last duration_ms are held back until the input
+    ends, so the length of the recording does not have to be known.
+    process() gets that held-back tail.
+    """
+
+    def __init__(self, duration_ms):
+        self.duration_ms = duration_ms
+
+    def __repr__(self):
+        return f"FadeOut({self.duration_ms})"
+
+    def tail_frames(self, rate):
+        return int(self.duration_ms * rate / 1000)
+
+    def process(self, samples, position, rate):
+        count = len(samples)
+        if count:
+            ramp = np.arange(count, 0, -1, dtype=np.float32)
+            ramp /= count
+            samples *= ramp[:, None]
+        return samples
+
+
+class Downmix(AudioOperation):
+    """Mix all channels down to mono"""
+
+    def __init__(self):
+        self.buffer = None
+
+    def __repr__(self):
+        return "Downmix()"
+
+    def output_channels(self, channels):
+        return 1
+
+    def process(self, samples, position, rate):
+        if samples.shape[1] == 1:
+            return samples
+
+        # Mono needs a narrower buffer; it is allocated once and reused
+        if self.buffer is None or len(self.buffer) < len(samples):
+            self.buffer = np.empty((len(samples), 1), dtype=np.float32)
+        mono = self.buffer[:len(samples)]
+
+        # Add channel columns pairwise; np.mean over a 2-wide axis is much slower
+        np.add(samples[:, 0], samples[:, 1], out=mono[:, 0])
+        for channel in range(2, samples.shape[1]):
+            mono[:, 0] += samples[:, channel]
+        mono *= np.float32(1 / samples.shape[1])
+        return mono
+
+
+def read_into(stream, view):
+    """Fill view from a pipe; returns the number of bytes read (fewer only at the end)"""
+    filled = 0
+    while filled < len(view):
+        count = stream.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+def pcm_chunks(stream, channels, chunk_frames=CHUNK_FRAMES):
+    """Yield (samples, position) for PCM read from stream
+
+    Every chunk is a float32 view of the same bytearray (np.frombuffer
+    does not copy), so reading a recording of any length allocates once.
+    """
+    buffer = bytearray(chunk_frames * channels * SAMPLE_WIDTH)
+    samples = np.frombuffer(buffer, dtype=np.float32).reshape(chunk_frames, channels)
+    view = memoryview(buffer)
+    frame_size = channels * SAMPLE_WIDTH
+    position = 0
+    while True:
+        frames = read_into(stream, view) // frame_size
+        if not frames:
+            return
+        yield samples[:frames], position
+        position += frames
+
+
+def ffmpeg_command(ffmpeg_path):
+    return [ffmpeg_path, "-hide_banner", "-nostdin", "-loglevel", "error"]
+
+
+def start_decoder(ffmpeg_path, input_path, channels, rate, log):
+    """Start an ffmpeg process that writes the first audio stream as PCM to stdout"""
+    return subprocess.Popen(
+        ffmpeg_command(ffmpeg_path)
+        + ["-i", input_path, "-map", "0:a:0", "-ac", str(channels), "-ar", str(rate), "-f", SAMPLE_FORMAT, "-"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=log
+    )
+
+
+def check_processes(processes):
+    """Raise FFmpegError for the first (process, log, name) that failed"""
+    for process, log, name in processes:
+        if process.returncode != 0:
+            log.seek(0)
+            message = stderr_tail(log.read().decode("utf-8", "replace"))
+            raise FFmpegError(message or f"ffmpeg {name} exited with code {process.returncode}")
+
+
+def measure_peak(input_path, operations, channels, rate, ffmpeg_path, chunk_frames=CHUNK_FRAMES):
+    """Decode once and get the highest absolute sample after operations"""
+    peak = 0.0
+    with tempfile.TemporaryFile() as log:
+        decoder = start_decoder(ffmpeg_path, input_path, channels, rate, log)
+        try:
+            for samples, position in pcm_chunks(decoder.stdout, channels, chunk_frames):
+                for operation in operations:
+                    samples = operation.process(samples, position, rate)
+                peak = max(peak, float(samples.max()), -float(samples.min()))
+        finally:
+            decoder.stdout.close()
+            decoder.wait()
+        check_processes([(decoder, log, "decoder")])
+    return peak
+
+
+def process_chunks(chunks, operations, rate, write):
+    """Run operations over (samples, position) chunks and pass the results to write"""
+    fade_out = None
+    chunk_operations = []
+    for operation in operations:
+        if isinstance(operation, FadeOut):
+            fade_out = operation
+        else:
+            chunk_operations.append(operation)
+
+    held = None  # Tail kept back for the fade-out
+    held_frames = 0
+    tail_frames = fade_out.tail_frames(rate) if fade_out else 0
+    for samples, position in chunks:
+        for operation in chunk_operations:
+            samples = operation.process(samples, position, rate)
+
+        if fade_out is None:
+            write(samples)
+            continue
+
+        # Append to the tail buffer and write everything before the last tail_frames
+        if held is None or len(held) < tail_frames + len(samples):
+            grown = np.empty((tail_frames + len(samples), samples.shape[1]), dtype=np.float32)
+            if held is not None:
+                grown[:held_frames] = held[:held_frames]
+            held = grown
+        held[held_frames:held_frames + len(samples)] = samples
+        held_frames += len(samples)
+        extra = held_frames - tail_frames
+        if extra > 0:
+            write(held[:extra])
+            held[:tail_frames] = held[extra:held_frames]
+            held_frames = tail_frames
+
+    if held is not None:
+        write(fade_out.process(held[:held_frames], 0, rate))
+
+
+def stream_process_audio(input_path, outputs, operations, ffmpeg_path=None, chunk_frames=CHUNK_FRAMES):
+    """Apply operations to a recording of any length with bounded memory
+
+    One ffmpeg process decodes to float PCM on a pipe, the operations run
+    in place on fixed-size NumPy views of one buffer, and the result is
+    written straight to the stdin of a second ffmpeg process that encodes
+    every (target_format, output_file) in outputs.
+    Normalize needs an extra decoding pass to find the peak first.
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    stream = first_stream(probe_file(input_path, ffmpeg_path), "audio")
+    if stream is None:
+        raise FFmpegError(f"No audio stream in {input_path}")
+    # Guessing the channel count would silently downmix surround sound
+    channels = stream["channels"]
+    if not channels:
+        raise FFmpegError(f"Could not read the channel layout of {input_path}")
+    rate = stream["sample_rate"] or 44100
+
+    output_channels = channels
+    for index, operation in enumerate(operations):
+        if operation.needs_peak:
+            operation.set_peak(measure_peak(
+                input_path, operations[:index], channels, rate, ffmpeg_path, chunk_frames
+            ))
+        output_channels = operation.output_channels(output_channels)
+
+    encoder_args = ["-y", "-f", SAMPLE_FORMAT, "-ac", str(output_channels), "-ar", str(rate), "-i", "-"]
+    for target_format, output_file in outputs:
+        encoder_args += AUDIO_OUTPUT_ARGS[target_format] + [output_file]
+
+    with tempfile.TemporaryFile() as decoder_log, tempfile.TemporaryFile() as encoder_log:
+        decoder = start_decoder(ffmpeg_path, input_path, channels, rate, decoder_log)
+        encoder = subprocess.Popen(
+            ffmpeg_command(ffmpeg_path) + encoder_args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=encoder_log
+        )
+
+        try:
+            # Contiguous arrays go to the pipe through the buffer protocol, without a copy
+            chunks = pcm_chunks(decoder.stdout, channels, chunk_frames)
+            process_chunks(chunks, operations, rate, encoder.stdin.write)
+            encoder.stdin.close()
+        except BrokenPipeError:
+            decoder.kill()  # The encoder failed; its log is reported below
+        except BaseException:
+            decoder.kill()
+            encoder.kill()
+            raise
+        finally:
+            decoder.stdout.close()
+            decoder.wait()
+            encoder.wait()
+
+        # An encoder failure also stops the decoder, so report the encoder first
+        check_processes([(encoder, encoder_log, "encoder"), (decoder, decoder_log, "decoder")])
@@ -0,0 +1,213 @@
+import os
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+from audio_processing import CHUNK_FRAMES, check_processes, pcm_chunks, start_decoder
+from ffmpeg_tools import VIDEO_COPY_CODECS, FFmpegError, find_ffmpeg, first_stream, output_threads, run_ffmpeg
+
+# Pictures shown while the audio plays
+BACKGROUNDS = ["Waveform", "Image"]
+DEFAULT_BACKGROUND = "Waveform"
+
+# The picture never changes, so one frame per second is plenty; encoding
+# an hour of audio writes 3600 frames instead of 108000 at 30 fps
+STILL_FRAME_RATE = 1
+
+# Keyframes are the only frames with real picture data, so they are kept far apart;
+# seeking decodes at most this many seconds of 1 fps frames
+KEYFRAME_SECONDS = 30
+
+# Frame height when no size is chosen; the width follows at 16:9
+DEFAULT_HEIGHT = 720
+
+WAVEFORM_COLOR = "0x3c8dbc"
+
+# The waveform is read as mono at a low rate; a picture column covers far more than one sample anyway
+WAVEFORM_RATE = 8000
+
+# Peak ranges kept while reading; beyond this neighbours are merged, so memory does not grow with length
+WAVEFORM_MAX_BLOCKS = 65536
+
+# Encoder options for a picture that never changes
+STILL_IMAGE_TUNING = {"h264": ["-tune", "stillimage"]}
+
+# MPEG-2 aims at a bitrate, which its rate control cannot hold at one frame
+# per second, so it gets a fixed quality instead of the preset's options
+STILL_IMAGE_OPTIONS = {"mpeg2video": ["-c:v", "mpeg2video", "-q:v", "3", "-maxrate", "9M", "-bufsize", "1835k"]}
+
+
+def frame_size(height=None):
+    """16:9 frame size with even sides for an output height"""
+    height = height or DEFAULT_HEIGHT
+    width = (height * 16 // 9 + 1) // 2 * 2
+    return width, height
+
+
+def still_encoder_args(encoder, encoder_args):
+    """Adapt a preset's encoder options to a still picture"""
+    return STILL_IMAGE_OPTIONS.get(encoder, encoder_args) + STILL_IMAGE_TUNING.get(encoder, [])
+
+
+def is_audio_only(info):
+    """Check whether a probed file has audio but no video to convert (cover art does not count)"""
+    return first_stream(info, "video") is None and first_stream(info, "audio") is not None
+
+
+def can_copy_audio_into(info, target_format):
+    """Check whether the first audio stream can be stored in a video container as-is"""
+    stream = first_stream(info, "audio")
+    return stream is not None and stream["codec"] in VIDEO_COPY_CODECS.get(target_format, ([], []))[1]
+
+
+def waveform_peaks(input_path, columns, ffmpeg_path=None):
+    """Lowest and highest sample of each of columns equal slices of a recording
+
+    The audio is decoded once as mono PCM at WAVEFORM_RATE and every chunk
+    is reduced to the range of its blocks as it arrives. When there are more
+    than WAVEFORM_MAX_BLOCKS blocks, neighbours are merged and the block
+    length doubles, so a recording of any length needs the same memory.
+    """
+    ffmpeg_path = ffmpeg_path or find_ffmpeg()
+    block = 8
+    lows = np.empty(0, dtype=np.float32)
+    highs = np.empty(0, dtype=np.float32)
+    with tempfile.TemporaryFile() as log:
+        decoder = start_decoder(ffmpeg_path, input_path, 1, WAVEFORM_RATE, log)
+        try:
+            for samples, position in pcm_chunks(decoder.stdout, 1):
+                # Chunks are whole blocks; only the last one can end in a shorter block
+                starts = np.arange(0, len(samples), block)
+                lows = np.concatenate([lows, np.minimum.reduceat(samples[:, 0], starts)])
+                highs = np.concatenate([highs, np.maximum.reduceat(samples[:, 0], starts)])
+                if len(lows) > WAVEFORM_MAX_BLOCKS and block < CHUNK_FRAMES:
+                    if len(lows) % 2:
+                        # Only after the short last chunk; pairing its block with itself keeps the range
+                        lows, highs = np.append(lows, lows[-1]), np.append(highs, highs[-1])
+                    lows = lows.reshape(-1, 2).min(axis=1)
+                    highs = highs.reshape(-1, 2).max(axis=1)
+                    block *= 2
+        finally:
+            decoder.stdout.close()
+            decoder.wait()
+        check_processes([(decoder, log, "decoder")])
+    if not len(lows):
+        raise FFmpegError(f"No audio to draw in {input_path}")
+
+    starts = np.arange(columns) * len(lows) // columns
+    if len(lows) < columns:
+        return lows[starts], highs[starts]  # Short recordings stretch each block over several columns
+    return np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts)
+
+
+def render_waveform(input_path, image_path, size, ffmpeg_path=None):
+    """Draw the waveform of the whole recording into one picture
+
+    This only decodes the audio once, in a streamed pass; no video is encoded.
+    """
+    width, height = size
+    lows, highs = waveform_peaks(input_path, width, ffmpeg_path)
+
+    # Each column is filled between its highest and lowest sample around the middle row
+    middle = (height - 1) / 2
+    tops = np.floor(middle - np.clip(highs, -1, 1) * middle)
+    bottoms = np.ceil(middle - np.clip(lows, -1, 1) * middle)
+    rows = np.arange(height)[:, None]
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    color = int(WAVEFORM_COLOR, 16)
+    pixels[(rows >= tops) & (rows <= bottoms)] = (color >> 16, color >> 8 & 0xFF, color & 0xFF, 255)
+    Image.fromarray(pixels, "RGBA").save(image_path)
+
+
+def extract_cover_art(input_path, info, image_path, ffmpeg_path=None):
+    """Save the embedded cover art of a recording; returns False if it has none"""
+    videos = [stream for stream in info["streams"] if stream["type"] == "video"]
+    for index, stream in enumerate(videos):
+        if stream.get("still"):
+            run_ffmpeg(["-i", input_path, "-map", f"0:v:{index}", "-frames:v", "1", image_path], ffmpeg_path)
+            return True
+    return False
+
+
+def render_audio_video(input_path, picture_path, outputs, duration=None, threads=None, ffmpeg_path=None,
+                       on_progress=None):
+    """Encode a still picture at STILL_FRAME_RATE together with a recording
+
+    outputs is a list of (output_file, size, encoder, encoder_args,
+    copy_audio). One ffmpeg process reads the audio once and writes every
+    output: the picture is fitted into each frame size and encoded with
+    still-image tuning, and the audio is copied when copy_audio is set or
+    encoded with the container's default codec otherwise.
+    """
+    args = ["-framerate", str(STILL_FRAME_RATE), "-i", picture_path, "-i", input_path]
+
+    # The picture is decoded, scaled and converted once; the loop filter
+    # repeats that frame (an image input with -loop 1 decodes it again for
+    # every frame). It is cut at the length of the audio.
+    trim = f",trim=duration={duration:.3f}" if duration else ""
+    filters = [f"[0:v]split={len(outputs)}" + "".join(f"[picture{i}]" for i in range(len(outputs)))]
+    for i, (output_file, (width, height), encoder, encoder_args, copy_audio) in enumerate(outputs):
+        filters.append(
+            f"[picture{i}]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p,"
+            f"loop=loop=-1:size=1{trim}[frame{i}]"
+        )
+    args += ["-filter_complex", ";".join(filters)]
+
+    # Every output encodes its own video, so they split the job's threads
+    encoder_threads = output_threads(threads, len(outputs))
+    for i, (output_file, size, encoder, encoder_args, copy_audio) in enumerate(outputs):
+        args += encoder_threads + ["-map", f"[frame{i}]", "-map", "1:a:0"]
+        args += still_encoder_args(encoder, encoder_args)
+        args += ["-r", str(STILL_FRAME_RATE), "-g", str(STILL_FRAME_RATE * KEYFRAME_SECONDS)]
+        if copy_audio:
+            args += ["-c:a", "copy"]
+        args += ["-shortest", output_file]
+    run_ffmpeg(args, ffmpeg_path, on_progress=on_progress)
+
+
+def make_picture(input_path, info, background, image_path, size, folder, ffmpeg_path=None):
+    """Get the picture to show for a recording, creating it in folder if needed
+
+    "Image" uses image_path, or the recording's cover art when no image is
+    chosen, or the waveform when it has none.
+    """
+    if background == "Image":
+        if image_path:
+            return image_path
+        cover_path = os.path.join(folder, "cover.png")
+        if extract_cover_art(input_path, info, cover_path, ffmpeg_path):
+            return cover_path
+    waveform_path = os.path.join(folder, "waveform.png")
+    render_waveform(input_path, waveform_path, size, ffmpeg_path)
+    return waveform_path
+
+
+def convert_audio_to_video(input_path, info, outputs, background=DEFAULT_BACKGROUND, image_path=None,
+                           ffmpeg_path=None, threads=None, on_progress=None):
+    """Turn a recording into video files that show a still picture
+
+    outputs is a list of (output_file, height, encoder, encoder_args)
+    where height None uses DEFAULT_HEIGHT. The picture is made once at the
+    largest frame size and scaled for the others. Returns {output_file:
+    "copied" or "converted"} depending on whether the audio stream was
+    copied into the container.
+    """
+    target_sizes = [frame_size(height) for output_file, height, encoder, encoder_args in outputs]
+    largest = max(target_sizes, key=lambda size: size[1])
+    folder = os.path.dirname(os.path.abspath(outputs[0][0]))
+    methods = {}
+    render_outputs = []
+    for (output_file, height, encoder, encoder_args), size in zip(outputs, target_sizes):
+        target_format = os.path.splitext(output_file)[1][1:].lower()
+        copy_audio = can_copy_audio_into(info, target_format)
+        methods[output_file] = "copied" if copy_audio else "converted"
+        render_outputs.append((output_file, size, encoder, encoder_args, copy_audio))
+
+    with tempfile.TemporaryDirectory(prefix="picture-", dir=folder) as temp_folder:
+        picture_path = make_picture(input_path, info, background, image_path, largest, temp_folder, ffmpeg_path)
+        render_audio_video(
+            input_path, picture_path, render_outputs, info["duration"], threads, ffmpeg_path, on_progress
+        )
+    return methods
@@ -0,0 +1,208 @@
+import glob
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from conversion_cache import default_cache_dir
+
+
+def journal_dir():
+    """Folder holding the journals of unfinished batches"""
+    return os.path.join(default_cache_dir(), "journals")
+
+
+# Numbers the temporary names of this process; next() on a count is safe across threads
+temp_numbers = itertools.count(1)
+
+
+def temp_output_path(output_file):
+    """Name a converter writes to before the output is complete
+
+    The extension is kept so ffmpeg and Pillow still pick the right format.
+    The process id and a counter make the name unique, so two jobs writing
+    the same output name never share a temporary file.
+    """
+    root, extension = os.path.splitext(output_file)
+    return f"{root}.part-{os.getpid()}-{next(temp_numbers)}{extension}"
+
+
+def unique_output_name(name, taken):
+    """Number name as "name (2)", "name (3)"... while another file of the batch uses it
+
+    taken holds the names given out so far and is updated. Case is ignored,
+    as it is on Windows and macOS file systems.
+    """
+    unique = name
+    number = 2
+    while unique.lower() in taken:
+        unique = f"{name} ({number})"
+        number += 1
+    taken.add(unique.lower())
+    return unique
+
+
+@contextmanager
+def atomic_outputs(output_files):
+    """Write to temporary names and rename them over output_files on success
+
+    Yields the list of temporary paths. A crash or error never leaves a
+    half-written file under a final name.
+    """
+    temps = [temp_output_path(output_file) for output_file in output_files]
+    try:
+        yield temps
+        for temp, output_file in zip(temps, output_files):
+            os.replace(temp, output_file)
+    except BaseException:
+        for temp in temps:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+        raise
+
+
+@contextmanager
+def atomic_output(output_file):
+    """Write one file to a temporary name; see atomic_outputs"""
+    with atomic_outputs([output_file]) as temps:
+        yield temps[0]
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class BatchJournal:
+    """Append-only record of a batch, so an interrupted run can be resumed
+
+    The first line holds the converter, its settings and the input files.
+    Every finished file appends a line with the size and mtime of its
+    outputs. A file counts as complete on resume only while those outputs
+    are still unchanged. The journal is deleted when the batch finishes.
+    """
+
+    def __init__(self, path, header, completed=None):
+        self.path = path
+        self.header = header
+        self.completed = completed or {}
+
+    @classmethod
+    def create(cls, converter, settings, input_paths):
+        """Start the journal of a new batch, replacing older ones of the converter"""
+        os.makedirs(journal_dir(), exist_ok=True)
+        for old_path in glob.glob(os.path.join(journal_dir(), f"{converter}-*.jsonl")):
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        path = os.path.join(journal_dir(), f"{converter}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        header = {
+            "type": "batch",
+            "converter": converter,
+            "started": time.time(),
+            "settings": settings,
+            "inputs": list(input_paths),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+        return cls(path, header)
+
+    @classmethod
+    def load(cls, path):
+        """Read a journal; a line cut short by a crash is ignored"""
+        header = None
+        completed = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "batch":
+                    header = record
+                elif record.get("type") == "done":
+                    completed[record["input"]] = record["outputs"]
+        if header is None:
+            raise ValueError(f"{path} is not a batch journal")
+        return cls(path, header, completed)
+
+    @classmethod
+    def latest(cls, converter):
+        """Load the most recent unfinished batch of a converter, or None"""
+        paths = sorted(glob.glob(os.path.join(journal_dir(), f"{converter}-*.jsonl")), key=os.path.getmtime)
+        for path in reversed(paths):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError):
+                continue
+        return None
+
+    @property
+    def settings(self):
+        return self.header["settings"]
+
+    @property
+    def inputs(self):
+        return self.header["inputs"]
+
+    def started(self):
+        """When the batch was started, for display"""
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(self.header["started"]))
+
+    def is_complete(self, input_path):
+        """Check that a file finished and its outputs are still the ones written"""
+        outputs = self.completed.get(input_path)
+        if not outputs:
+            return False
+        for output in outputs:
+            try:
+                if file_signature(output["path"]) != output:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def completed_count(self):
+        return sum(1 for input_path in self.inputs if self.is_complete(input_path))
+
+    def mark_done(self, input_path, output_files):
+        """Record that input_path finished and wrote output_files"""
+        try:
+            outputs = [file_signature(output_file) for output_file in output_files]
+        except OSError:
+            return  # Not verifiable, so it is converted again on resume
+        self.completed[input_path] = outputs
+        self.append({"type": "done", "input": input_path, "outputs": outputs})
+
+    def mark_failed(self, input_path, error):
+        """Record a failed file; it is converted again on resume"""
+        self.append({"type": "failed", "input": input_path, "error": str(error)})
+
+    def append(self, record):
+        # Synced line by line so a crash loses at most the record being written
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            pass  # A full disk must not stop the batch; the file is just converted again on resume
+
+    def finish(self):
+        """The batch ran to the end; nothing is left to resume"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def open_journal(converter, settings, input_paths):
+    """Start a batch journal, or None if the cache folder is not writable"""
+    try:
+        return BatchJournal.create(converter, settings, input_paths)
+    except OSError:
+        return None
@@ -0,0 +1,7 @@
+"""Headless performance benchmarks for the converters
+
+Run from the project folder, for example:
+    python -m benchmarks.image_benchmark --output image_results.json
+    python -m benchmarks.audio_benchmark --output audio_results.json
+    python -m benchmarks.video_benchmark --output video_results.json
+"""
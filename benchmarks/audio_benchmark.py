@@ -0,0 +1,160 @@
+"""Benchmark the audio converter across every source -> target format pair
+
+Inputs (sine, noise and silence) are generated locally with ffmpeg's lavfi
+sources at several durations and channel layouts. Each case runs in a
+fresh worker process with an empty probe cache, so peak RSS and the
+number of ffmpeg processes started belong to that case alone.
+
+    python -m benchmarks.audio_benchmark --output results.json
+    python -m benchmarks.audio_benchmark --output new.json --compare results.json
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from audio_converter import convert_audio_file
+from audio_processing import FadeIn, FadeOut, Gain, Limit, Normalize
+from benchmarks.common import (
+    benchmark_parser, environment_info, ffmpeg_version, finish_benchmark, fresh_process_runner, use_empty_cache
+)
+from ffmpeg_tools import AUDIO_FORMATS, AUDIO_OUTPUT_ARGS, find_ffmpeg, run_ffmpeg
+from resource_usage import children_peak_rss_bytes, peak_rss_bytes
+
+SAMPLE_RATE = 48000
+
+# lavfi source filters by name; {duration} and {rate} are filled in
+KINDS = {
+    "sine": "sine=frequency=440:sample_rate={rate}:duration={duration}",
+    "noise": "anoisesrc=color=pink:amplitude=0.5:sample_rate={rate}:duration={duration}",
+    "silence": "anullsrc=sample_rate={rate}:duration={duration}",
+}
+
+LAYOUTS = {"mono": 1, "stereo": 2, "5.1": 6}
+
+# Sample-level chains, for the streaming NumPy processing stage
+PROCESSING = {
+    "none": lambda: [],
+    "chain": lambda: [Normalize(), Gain(-3), Limit(), FadeIn(1000), FadeOut(1000)],
+}
+
+KEY_FIELDS = ["kind", "duration", "layout", "source", "target", "processing"]
+METRICS = {"realtime_factor": "higher", "ffmpeg_peak_rss": "lower", "ffmpeg_spawns": "lower"}
+
+
+def write_source(kind, duration, layout, source_format, folder, ffmpeg_path):
+    """Generate a test recording in a source format and return its path"""
+    path = os.path.join(folder, f"{kind}-{duration}s-{layout}.{source_format}")
+    source = KINDS[kind].format(rate=SAMPLE_RATE, duration=duration)
+    run_ffmpeg(
+        ["-f", "lavfi", "-i", source, "-ac", str(LAYOUTS[layout])] + AUDIO_OUTPUT_ARGS[source_format] + [path],
+        ffmpeg_path
+    )
+    return path
+
+
+def count_spawns():
+    """Count every subprocess started from now on in this process; returns a one-item list"""
+    counter = [0]
+    original = subprocess.Popen.__init__
+
+    def counting_init(self, *args, **kwargs):
+        counter[0] += 1
+        original(self, *args, **kwargs)
+
+    subprocess.Popen.__init__ = counting_init
+    return counter
+
+
+def run_case(source_path, target_format, output_folder, duration, repeats, processing):
+    """Convert one file repeatedly and measure it (runs in a fresh worker process)"""
+    use_empty_cache(output_folder)
+    spawns = count_spawns()
+
+    output_file = os.path.join(output_folder, "output." + target_format)
+    timings = []
+    spawn_counts = []
+    for _ in range(repeats):
+        before = spawns[0]
+        start = time.perf_counter()
+        method = convert_audio_file(source_path, output_file, target_format, PROCESSING[processing]())
+        timings.append(time.perf_counter() - start)
+        spawn_counts.append(spawns[0] - before)
+
+    best = min(timings)
+    return {
+        "method": method,
+        "seconds": best,
+        "realtime_factor": duration / best,
+        "input_bytes": os.path.getsize(source_path),
+        "output_bytes": os.path.getsize(output_file),
+        "ffmpeg_spawns": spawn_counts[0],
+        "ffmpeg_spawns_cached": spawn_counts[-1],
+        "peak_rss": peak_rss_bytes(),
+        "ffmpeg_peak_rss": children_peak_rss_bytes(),
+    }
+
+
+def parse_args(argv):
+    parser = benchmark_parser(__doc__.splitlines()[0], repeats=3)
+    parser.add_argument("--durations", nargs="+", type=int, default=[10, 60], help="input lengths in seconds")
+    parser.add_argument("--layouts", nargs="+", default=["mono", "stereo"], choices=list(LAYOUTS))
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=list(KINDS))
+    parser.add_argument("--sources", nargs="+", default=AUDIO_FORMATS, type=str.lower, choices=AUDIO_FORMATS)
+    parser.add_argument("--targets", nargs="+", default=AUDIO_FORMATS, type=str.lower, choices=AUDIO_FORMATS)
+    parser.add_argument("--processing", default="none", choices=list(PROCESSING))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        print("ffmpeg was not found", file=sys.stderr)
+        return 2
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="audio-bench-") as folder:
+        # One fresh process per case keeps peak RSS and spawn counts independent
+        with fresh_process_runner() as run_isolated:
+            for kind in args.kinds:
+                for duration in args.durations:
+                    for layout in args.layouts:
+                        for source in args.sources:
+                            try:
+                                source_path = write_source(kind, duration, layout, source, folder, ffmpeg_path)
+                            except Exception as e:
+                                # Some encoders cannot store every layout (e.g. 5.1 MP3)
+                                print(f"Skipping {kind} {duration}s {layout} {source}: {e}", file=sys.stderr)
+                                continue
+
+                            for target in args.targets:
+                                case = {
+                                    "kind": kind,
+                                    "duration": duration,
+                                    "layout": layout,
+                                    "source": source,
+                                    "target": target,
+                                    "processing": args.processing,
+                                }
+                                try:
+                                    case.update(run_isolated(
+                                        run_case, source_path, target, folder, duration,
+                                        args.repeats, args.processing
+                                    ))
+                                except Exception as e:
+                                    case["error"] = str(e)
+                                results.append(case)
+                                print(f"{kind} {duration}s {layout} {source} -> {target}: "
+                                      f"{case.get('realtime_factor', 0):.0f}x realtime", file=sys.stderr)
+
+    environment = environment_info(ffmpeg=ffmpeg_version(ffmpeg_path))
+    return finish_benchmark(
+        args, environment, results, KEY_FIELDS, METRICS,
+        ["method", "realtime_factor", "ffmpeg_peak_rss", "ffmpeg_spawns"]
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
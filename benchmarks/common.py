@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+
+def environment_info(**extra):
+    """Describe the machine a benchmark ran on"""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    info.update(extra)
+    return info
+
+
+def ffmpeg_version(ffmpeg_path):
+    """First line of "ffmpeg -version", for the environment of a run"""
+    return subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True).stdout.split("\n")[0]
+
+
+def use_empty_cache(folder):
+    """Point the probe and conversion caches of this process at a new folder inside folder
+
+    Called at the start of a case, so its first run pays for probing like a new file would.
+    """
+    os.environ["FILE_CONVERTER_CACHE_DIR"] = tempfile.mkdtemp(dir=folder)
+
+
+def benchmark_parser(description, repeats):
+    """Argument parser with the options every benchmark has"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", default="-", help="JSON results file ('-' for stdout)")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative change (default 0.10)")
+    parser.add_argument("--repeats", type=int, default=repeats, help="runs per case; the fastest is kept")
+    return parser
+
+
+@contextmanager
+def fresh_process_runner():
+    """Yield run(function, *args), which runs every call in a new worker process
+
+    A fresh process per case keeps peak RSS and similar figures independent.
+    max_tasks_per_child needs Python 3.11, so older versions start a pool
+    for every call instead.
+    """
+    if sys.version_info >= (3, 11):
+        with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as executor:
+            yield lambda function, *args: executor.submit(function, *args).result()
+        return
+
+    def run(function, *args):
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            return executor.submit(function, *args).result()
+
+    yield run
+
+
+def write_results(path, environment, results):
+    """Save benchmark results as JSON (to stdout when path is '-')"""
+    data = {"environment": environment, "results": results}
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w") as f:
+        f.write(text + "\n")
+
+
+def load_results(path):
+    """Load a JSON file written by write_results"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def case_key(result, key_fields):
+    return tuple(result.get(field) for field in key_fields)
+
+
+def compare_results(current, baseline, key_fields, metrics, threshold=0.10):
+    """Compare two result lists and describe every regression beyond threshold
+
+    metrics maps a metric name to "higher" or "lower", whichever is better.
+    Cases missing from either side are ignored.
+    """
+    baseline_cases = {case_key(r, key_fields): r for r in baseline}
+    regressions = []
+    for result in current:
+        key = case_key(result, key_fields)
+        old = baseline_cases.get(key)
+        if old is None:
+            continue
+
+        for metric, better in metrics.items():
+            new_value = result.get(metric)
+            old_value = old.get(metric)
+            if not new_value or not old_value:
+                continue
+
+            change = (new_value - old_value) / old_value
+            if (better == "higher" and change < -threshold) or (better == "lower" and change > threshold):
+                name = " ".join(str(part) for part in key)
+                regressions.append(f"{name}: {metric} {old_value:.4g} -> {new_value:.4g} ({change:+.1%})")
+    return regressions
+
+
+def print_table(results, columns):
+    """Print selected result fields as an aligned text table"""
+    widths = [max(len(column), *(len(format_value(r.get(column))) for r in results)) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        print("  ".join(format_value(result.get(column)).ljust(width) for column, width in zip(columns, widths)))
+
+
+def format_value(value):
+    if isinstance(value, float):
+        return f"{value:.3g}"
+    return "-" if value is None else str(value)
+
+
+def finish_benchmark(args, environment, results, key_fields, metrics, columns):
+    """Write the results, show columns as a table and check the baseline; returns the exit code
+
+    The table goes to stdout only when the JSON does not.
+    """
+    write_results(args.output, environment, results)
+    if args.output != "-":
+        print_table(results, key_fields + columns)
+
+    if args.compare:
+        return report_comparison(results, args.compare, key_fields, metrics, args.threshold)
+    return 0
+
+
+def report_comparison(results, baseline_path, key_fields, metrics, threshold):
+    """Print regressions against a baseline file; returns the process exit code"""
+    baseline = load_results(baseline_path)["results"]
+    regressions = compare_results(results, baseline, key_fields, metrics, threshold)
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%} against {baseline_path}", file=sys.stderr)
+        return 0
+
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%} against {baseline_path}:", file=sys.stderr)
+    for regression in regressions:
+        print("  " + regression, file=sys.stderr)
+    return 1
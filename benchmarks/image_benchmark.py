@@ -0,0 +1,162 @@
+"""Benchmark the image converter across every source -> target format pair
+
+Synthetic inputs (photo-like noise, flat graphics, transparency) are generated
+locally at several sizes. Each case runs in a fresh worker process so the
+reported peak RSS belongs to that case alone.
+
+    python -m benchmarks.image_benchmark --output results.json
+    python -m benchmarks.image_benchmark --output new.json --compare results.json
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, __version__ as pillow_version
+
+from benchmarks.common import benchmark_parser, environment_info, finish_benchmark, fresh_process_runner
+from codec_registry import available_codecs, codec_for_format, ensure_codecs_for
+from image_converter import DEFAULT_PRESET, ENCODER_PRESETS, IMAGE_FORMATS, convert_image_file
+from resource_usage import peak_rss_bytes
+
+# Image sizes by name (about 1, 4 and 12 megapixels)
+SIZES = {"1mp": (1152, 864), "4mp": (2304, 1728), "12mp": (4000, 3000)}
+
+KINDS = ["photo", "flat", "alpha"]
+
+KEY_FIELDS = ["kind", "size", "source", "target", "preset"]
+METRICS = {"images_per_sec": "higher", "mb_per_sec": "higher", "peak_rss": "lower", "output_bytes": "lower"}
+
+
+def make_image(kind, size, seed=0):
+    """Generate a synthetic test image"""
+    rng = np.random.default_rng(seed)
+    width, height = size
+
+    if kind == "flat":
+        # Flat colour blocks, like screenshots and logos
+        img = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(img)
+        for _ in range(80):
+            x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+            w, h = int(rng.integers(10, width // 4)), int(rng.integers(10, height // 4))
+            draw.rectangle([x, y, x + w, y + h], fill=tuple(int(c) for c in rng.integers(0, 256, 3)))
+        return img
+
+    # Photo-like: smooth low frequency structure with sensor noise on top
+    coarse = Image.fromarray(rng.integers(0, 256, (max(2, height // 16), max(2, width // 16), 3), dtype=np.uint8))
+    smooth = np.asarray(coarse.resize(size, Image.BICUBIC), dtype=np.int16)
+    noise = rng.integers(-12, 13, smooth.shape, dtype=np.int16)
+    pixels = np.clip(smooth + noise, 0, 255).astype(np.uint8)
+
+    if kind == "alpha":
+        # Radial transparency gradient
+        yy, xx = np.mgrid[0:height, 0:width]
+        distance = np.hypot(xx - width / 2, yy - height / 2) / (max(width, height) / 2)
+        alpha = np.clip(255 * (1.2 - distance), 0, 255).astype(np.uint8)
+        return Image.fromarray(np.dstack([pixels, alpha]), "RGBA")
+    return Image.fromarray(pixels, "RGB")
+
+
+def write_source(img, source_format, folder, name):
+    """Save a generated image in a source format and return its path"""
+    extension = source_format.lower()
+    path = os.path.join(folder, f"{name}.{extension}")
+    if extension in ["jpg", "jpeg", "bmp"] and img.mode == "RGBA":
+        img = img.convert("RGB")
+
+    ensure_codecs_for(extension)
+    if extension == "ico":
+        img.save(path, sizes=[(256, 256)])
+    elif extension in ["heic", "heif"]:
+        img.save(path, "HEIF")
+    else:
+        img.save(path)
+    return path
+
+
+def run_case(source_path, target_format, output_folder, repeats, preset):
+    """Convert one file repeatedly and measure it (runs in a fresh worker process)"""
+    output_file = os.path.join(output_folder, "output." + target_format)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = convert_image_file(source_path, output_file, target_format, preset=preset)
+        timings.append(time.perf_counter() - start)
+
+    with Image.open(source_path) as img:
+        pixels = img.width * img.height
+
+    best = min(timings)
+    input_bytes = os.path.getsize(source_path)
+    return {
+        "seconds": best,
+        "images_per_sec": 1 / best,
+        "mb_per_sec": input_bytes / best / (1024 * 1024),
+        "megapixels_per_sec": pixels / best / 1e6,
+        "input_bytes": input_bytes,
+        "output_bytes": os.path.getsize(result["output"]),
+        "peak_rss": peak_rss_bytes(),
+    }
+
+
+def parse_args(argv):
+    parser = benchmark_parser(__doc__.splitlines()[0], repeats=3)
+    parser.add_argument("--sizes", nargs="+", default=["1mp", "4mp"], choices=list(SIZES))
+    parser.add_argument("--kinds", nargs="+", default=KINDS, choices=KINDS)
+    parser.add_argument("--sources", nargs="+", default=IMAGE_FORMATS, type=str.upper)
+    parser.add_argument("--targets", nargs="+", default=IMAGE_FORMATS, type=str.upper)
+    parser.add_argument("--preset", default=DEFAULT_PRESET, choices=list(ENCODER_PRESETS))
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    codecs = available_codecs()
+
+    def usable(format_name):
+        codec = codec_for_format(format_name)
+        if codec and not codecs[codec]:
+            print(f"Skipping {format_name}: optional codec '{codec}' is not installed", file=sys.stderr)
+            return False
+        return True
+
+    sources = [f for f in args.sources if usable(f)]
+    targets = [f for f in args.targets if usable(f)]
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="image-bench-") as folder:
+        # One fresh process per case keeps peak RSS figures independent
+        with fresh_process_runner() as run_isolated:
+            for kind in args.kinds:
+                for size_name in args.sizes:
+                    img = make_image(kind, SIZES[size_name])
+                    for source in sources:
+                        source_path = write_source(img, source, folder, f"{kind}-{size_name}")
+                        for target in targets:
+                            case = {
+                                "kind": kind,
+                                "size": size_name,
+                                "source": source,
+                                "target": target,
+                                "preset": args.preset,
+                            }
+                            try:
+                                case.update(run_isolated(
+                                    run_case, source_path, target.lower(), folder, args.repeats, args.preset
+                                ))
+                            except Exception as e:
+                                case["error"] = str(e)
+                            results.append(case)
+                            print(f"{kind} {size_name} {source} -> {target}: "
+                                  f"{case.get('images_per_sec', 0):.2f} img/s", file=sys.stderr)
+
+    environment = environment_info(pillow=pillow_version, codecs=codecs)
+    return finish_benchmark(
+        args, environment, results, KEY_FIELDS, METRICS, ["images_per_sec", "mb_per_sec", "peak_rss", "output_bytes"]
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""Benchmark the video converter across every target container
+
+Test clips (testsrc2 with light noise, plus a sine tone) are generated
+locally with ffmpeg's lavfi sources at several resolutions and durations.
+Each case runs in a fresh worker process with an empty probe cache, so peak
+RSS and CPU time belong to that case alone. --batch N converts N copies at
+once with the converter's job count and threads per job, to catch
+scheduler regressions as well as preset ones.
+
+    python -m benchmarks.video_benchmark --output results.json
+    python -m benchmarks.video_benchmark --output new.json --compare results.json
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    benchmark_parser, environment_info, ffmpeg_version, finish_benchmark, fresh_process_runner, use_empty_cache
+)
+from ffmpeg_tools import find_ffmpeg, run_ffmpeg
+from job_scheduler import threads_per_job
+from resource_usage import children_cpu_seconds, children_peak_rss_bytes, peak_rss_bytes
+from video_converter import ENCODER_PRESETS, DEFAULT_PRESET, VIDEO_TARGET_FORMATS, convert_video_file, video_job_count
+
+FRAME_RATE = 30
+
+RESOLUTIONS = {"360p": (640, 360), "720p": (1280, 720), "1080p": (1920, 1080)}
+
+# Source encodings by container: a camera-like H.264/AAC file and an older MPEG-4/MP3 AVI
+SOURCES = {
+    "mp4": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p", "-c:a", "aac"],
+    "avi": ["-c:v", "mpeg4", "-q:v", "2", "-c:a", "libmp3lame", "-b:a", "192k"],
+}
+
+TARGETS = [extension for display_name, extension in VIDEO_TARGET_FORMATS]
+
+KEY_FIELDS = ["resolution", "duration", "source", "target", "preset", "remux", "batch"]
+METRICS = {
+    "encode_fps": "higher",
+    "realtime_factor": "higher",
+    "cpu_utilization": "higher",
+    "ffmpeg_peak_rss": "lower",
+    "output_bitrate": "lower",
+}
+
+
+def write_source(resolution, duration, source_format, folder, ffmpeg_path):
+    """Generate a test clip in a source format and return its path"""
+    width, height = RESOLUTIONS[resolution]
+    path = os.path.join(folder, f"clip-{resolution}-{duration}s.{source_format}")
+    # Light temporal noise keeps the encoders from predicting the pattern perfectly
+    video = f"testsrc2=size={width}x{height}:rate={FRAME_RATE}:duration={duration},noise=alls=3:allf=t"
+    audio = f"sine=frequency=440:sample_rate=48000:duration={duration}"
+    run_ffmpeg(
+        ["-f", "lavfi", "-i", video, "-f", "lavfi", "-i", audio] + SOURCES[source_format] + [path],
+        ffmpeg_path
+    )
+    return path
+
+
+def run_case(source_path, target_format, output_folder, duration, preset, allow_copy, batch, repeats):
+    """Convert batch copies of a clip repeatedly and measure it (runs in a fresh worker process)"""
+    use_empty_cache(output_folder)
+
+    # Same concurrency as the converter's batch
+    jobs = min(video_job_count(), batch)
+    threads = threads_per_job(jobs)
+    output_files = [os.path.join(output_folder, f"output-{index}.{target_format}") for index in range(batch)]
+
+    def convert(output_file):
+        return convert_video_file(source_path, output_file, threads=threads, allow_copy=allow_copy, preset=preset)
+
+    timings = []
+    cpu_times = []
+    for _ in range(repeats):
+        cpu_before = children_cpu_seconds()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            methods = list(executor.map(convert, output_files))
+        timings.append(time.perf_counter() - start)
+        cpu_times.append(children_cpu_seconds() - cpu_before)
+
+    best = timings.index(min(timings))
+    seconds = timings[best]
+    output_bytes = sum(os.path.getsize(output_file) for output_file in output_files) / batch
+    return {
+        "method": methods[0],
+        "jobs": jobs,
+        "threads": threads,
+        "seconds": seconds,
+        "encode_fps": batch * duration * FRAME_RATE / seconds,
+        "realtime_factor": batch * duration / seconds,
+        # Share of all cores kept busy by ffmpeg; low values mean idle cores
+        "cpu_utilization": cpu_times[best] / (seconds * (os.cpu_count() or 1)),
+        "input_bytes": os.path.getsize(source_path),
+        "output_bytes": output_bytes,
+        "output_bitrate": output_bytes * 8 / duration,
+        "peak_rss": peak_rss_bytes(),
+        "ffmpeg_peak_rss": children_peak_rss_bytes(),
+    }
+
+
+def parse_args(argv):
+    parser = benchmark_parser(__doc__.splitlines()[0], repeats=1)
+    parser.add_argument("--resolutions", nargs="+", default=["360p", "720p"], choices=list(RESOLUTIONS))
+    parser.add_argument("--durations", nargs="+", type=int, default=[10], help="clip lengths in seconds")
+    parser.add_argument("--sources", nargs="+", default=["mp4"], type=str.lower, choices=list(SOURCES))
+    parser.add_argument("--targets", nargs="+", default=TARGETS, type=str.lower, choices=TARGETS)
+    parser.add_argument("--presets", nargs="+", default=[DEFAULT_PRESET], choices=list(ENCODER_PRESETS))
+    parser.add_argument("--no-remux", action="store_true",
+                        help="always re-encode, even when the streams fit the target container")
+    parser.add_argument("--batch", type=int, default=1, help="copies of each clip converted at once")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ffmpeg_path = find_ffmpeg()
+    if not ffmpeg_path:
+        print("ffmpeg was not found", file=sys.stderr)
+        return 2
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="video-bench-") as folder:
+        # One fresh process per case keeps peak RSS and CPU time independent
+        with fresh_process_runner() as run_isolated:
+            for resolution in args.resolutions:
+                for duration in args.durations:
+                    for source in args.sources:
+                        try:
+                            source_path = write_source(resolution, duration, source, folder, ffmpeg_path)
+                        except Exception as e:
+                            print(f"Skipping {resolution} {duration}s {source}: {e}", file=sys.stderr)
+                            continue
+
+                        for target in args.targets:
+                            for preset in args.presets:
+                                case = {
+                                    "resolution": resolution,
+                                    "duration": duration,
+                                    "source": source,
+                                    "target": target,
+                                    "preset": preset,
+                                    "remux": not args.no_remux,
+                                    "batch": args.batch,
+                                }
+                                try:
+                                    case.update(run_isolated(
+                                        run_case, source_path, target, folder, duration, preset,
+                                        not args.no_remux, args.batch, args.repeats
+                                    ))
+                                except Exception as e:
+                                    case["error"] = str(e)
+                                results.append(case)
+                                print(f"{resolution} {duration}s {source} -> {target} ({preset}): "
+                                      f"{case.get('encode_fps', 0):.1f} fps, "
+                                      f"{case.get('realtime_factor', 0):.2f}x realtime", file=sys.stderr)
+
+    environment = environment_info(ffmpeg=ffmpeg_version(ffmpeg_path))
+    return finish_benchmark(
+        args, environment, results, KEY_FIELDS, METRICS,
+        ["method", "encode_fps", "realtime_factor", "cpu_utilization", "ffmpeg_peak_rss", "output_bitrate"]
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import importlib
+import importlib.util
+import os
+
+# Optional Pillow plugins, the function that registers them and the formats they add
+OPTIONAL_CODECS = {
+    "heif": {"module": "pillow_heif", "register": "register_heif_opener", "formats": ["heic", "heif"]},
+    "avif": {"module": "pillow_heif", "register": "register_avif_opener", "formats": ["avif"]},
+}
+
+# Registration result per codec for this process (True, or False when unavailable)
+_registered = {}
+
+
+def codec_for_format(format_name):
+    """Get the optional codec that handles a format name or file path, if any"""
+    format_name = os.path.splitext(format_name)[1] or format_name
+    format_name = format_name.lstrip(".").lower()
+    for name, codec in OPTIONAL_CODECS.items():
+        if format_name in codec["formats"]:
+            return name
+    return None
+
+
+def ensure_codec(name):
+    """Import and register an optional codec once per process; returns True if usable"""
+    if name in _registered:
+        return _registered[name]
+
+    codec = OPTIONAL_CODECS[name]
+    try:
+        module = importlib.import_module(codec["module"])
+        getattr(module, codec["register"])()
+        _registered[name] = True
+    except (ImportError, AttributeError):
+        _registered[name] = False
+    return _registered[name]
+
+
+def ensure_codecs_for(*formats):
+    """Register the codecs needed for the given format names or file paths
+
+    Must be called before Image.open so that inputs can be decoded too.
+    Returns False if any of the needed codecs is unavailable.
+    """
+    usable = True
+    for format_name in formats:
+        name = codec_for_format(format_name)
+        if name and not ensure_codec(name):
+            usable = False
+    return usable
+
+
+def available_codecs():
+    """Report which optional codecs are installed, without paying for their import
+
+    Codecs that were already registered report their actual result.
+    """
+    available = {}
+    for name, codec in OPTIONAL_CODECS.items():
+        if name in _registered:
+            available[name] = _registered[name]
+        else:
+            available[name] = importlib.util.find_spec(codec["module"]) is not None
+    return available
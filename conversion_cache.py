@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Bump when converter output changes so old cache entries are not reused
+CACHE_VERSION = 1
+
+# Default size limit of the cache folder (2 GB)
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def default_cache_dir():
+    """Get the per-user folder used for cached conversions
+
+    FILE_CONVERTER_CACHE_DIR overrides it, e.g. for isolated benchmark runs.
+    """
+    if os.environ.get("FILE_CONVERTER_CACHE_DIR"):
+        return os.environ["FILE_CONVERTER_CACHE_DIR"]
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "FileConverter", "cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "FileConverter")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "file-converter")
+
+
+def place_file(source, destination):
+    """Hard link source to destination, copying when linking is not possible"""
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Copy under a temporary name so an interrupted copy never looks complete;
+        # the name is unique because two jobs can place the same destination
+        handle, temp = tempfile.mkstemp(prefix=os.path.basename(destination) + ".part-",
+                                        dir=os.path.dirname(destination) or ".")
+        os.close(handle)
+        try:
+            shutil.copy2(source, temp)
+            os.replace(temp, destination)
+        except BaseException:
+            os.remove(temp)
+            raise
+
+
+class ConversionCache:
+    """Content-addressed store of converted files shared by all converters
+
+    Entries are keyed by the SHA-256 of the input file, the target format and
+    the encoder options. File digests are remembered by path, size and mtime,
+    so unchanged inputs are not hashed again. The folder is kept under
+    max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.files_dir = os.path.join(self.cache_dir, "files")
+        os.makedirs(self.files_dir, exist_ok=True)
+
+        # SQLite keeps the index safe to share between worker processes
+        self.db = sqlite3.connect(os.path.join(self.cache_dir, "index.db"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS digests ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, filename TEXT, size INTEGER, mtime_ns INTEGER, last_used REAL)"
+            )
+
+    def close(self):
+        """Close the index database"""
+        self.db.close()
+
+    def file_digest(self, path):
+        """Get the content hash of a file, reusing it while size and mtime match"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        row = self.db.execute(
+            "SELECT digest FROM digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest)
+            )
+        return digest
+
+    def make_key(self, input_path, target_format, options=None):
+        """Build the cache key for converting input_path with the given settings"""
+        settings = json.dumps(
+            {"version": CACHE_VERSION, "format": target_format, "options": options or {}},
+            sort_keys=True
+        )
+        return hashlib.sha256(
+            (self.file_digest(input_path) + settings).encode("utf-8")
+        ).hexdigest()
+
+    def fetch(self, key, output_file):
+        """Place a cached result at output_file; returns False on a cache miss"""
+        row = self.db.execute(
+            "SELECT filename, size, mtime_ns FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if not row:
+            return False
+
+        # Outputs are hard links to the entry, so writing to an old output
+        # in place would change the cached file as well
+        cached = os.path.join(self.files_dir, row[0])
+        try:
+            stat = os.stat(cached)
+        except OSError:
+            stat = None
+        if stat is None or (stat.st_size, stat.st_mtime_ns) != (row[1], row[2]):
+            self.forget(key)
+            return False
+
+        place_file(cached, output_file)
+        with self.db:
+            self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return True
+
+    def store(self, key, output_file):
+        """Add a freshly converted file to the cache"""
+        extension = os.path.splitext(output_file)[1]
+        filename = key + extension
+        cached = os.path.join(self.files_dir, filename)
+        temp = cached + ".tmp"
+
+        place_file(output_file, temp)
+        os.replace(temp, cached)
+        stat = os.stat(cached)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, filename, stat.st_size, stat.st_mtime_ns, time.time())
+            )
+        self.evict()
+
+    def forget(self, key):
+        """Drop a single entry"""
+        row = self.db.execute("SELECT filename FROM entries WHERE key = ?", (key,)).fetchone()
+        with self.db:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if row:
+            try:
+                os.remove(os.path.join(self.files_dir, row[0]))
+            except OSError:
+                pass
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.forget(key)
+            total -= size
+
+
+def store_in_cache(cache, key, output_file):
+    """Add a converted file to the cache; a failure only loses the reuse, not the file"""
+    try:
+        cache.store(key, output_file)
+    except (OSError, sqlite3.Error):
+        pass
+
+
+def open_cache(cache_dir=None):
+    """Open the conversion cache, or None if its folder or index cannot be opened
+
+    A read-only profile or a locked index then only costs the reuse of
+    earlier results; files are still converted.
+    """
+    try:
+        return ConversionCache(cache_dir)
+    except (OSError, sqlite3.Error):
+        return None
@@ -0,0 +1,373 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from collections import deque
+
+# ffmpeg output arguments per audio target format (codec, options, container)
+AUDIO_OUTPUT_ARGS = {
+    "mp3": ["-c:a", "libmp3lame", "-f", "mp3"],
+    "wav": ["-c:a", "pcm_s16le", "-f", "wav"],
+    "aac": ["-c:a", "aac", "-f", "adts"],  # AAC in ADTS container
+    "m4a": ["-c:a", "aac", "-f", "ipod"],  # AAC in MP4 container
+    "ogg": ["-c:a", "libvorbis", "-f", "ogg"],
+    "wma": ["-c:a", "wmav2", "-f", "asf"],  # Windows Media Audio
+    "flac": ["-c:a", "flac", "-compression_level", "8", "-f", "flac"],  # Higher quality FLAC
+}
+
+AUDIO_FORMATS = list(AUDIO_OUTPUT_ARGS)
+
+# Audio codecs each target can take as-is, so the stream is copied instead of re-encoded
+AUDIO_COPY_CODECS = {
+    "mp3": ["mp3"],
+    "wav": ["pcm_s16le"],
+    "aac": ["aac"],
+    "m4a": ["aac", "alac"],
+    "ogg": ["vorbis"],
+    "wma": ["wmav1", "wmav2"],
+    "flac": ["flac"],
+}
+
+# Muxer used for each audio target when copying
+AUDIO_CONTAINERS = {
+    "mp3": "mp3", "wav": "wav", "aac": "adts", "m4a": "ipod",
+    "ogg": "ogg", "wma": "asf", "flac": "flac",
+}
+
+# Video and audio codecs each video container can take as-is, so a
+# container change is a remux (stream copy) instead of a re-encode
+VIDEO_COPY_CODECS = {
+    "mp4": (["h264", "hevc", "mpeg4", "av1", "vp9"], ["aac", "mp3", "alac", "ac3", "eac3", "opus", "flac"]),
+    "mov": (["h264", "hevc", "mpeg4", "prores", "mjpeg"], ["aac", "mp3", "alac", "ac3", "pcm_s16le"]),
+    "mkv": (
+        ["h264", "hevc", "mpeg4", "av1", "vp8", "vp9", "mpeg1video", "mpeg2video", "theora", "prores", "mjpeg"],
+        ["aac", "mp3", "mp2", "alac", "ac3", "eac3", "dts", "opus", "vorbis", "flac", "pcm_s16le"],
+    ),
+    "webm": (["vp8", "vp9", "av1"], ["opus", "vorbis"]),
+    "avi": (["mpeg4", "h264", "mjpeg", "msmpeg4v3"], ["mp3", "mp2", "ac3", "pcm_s16le"]),
+    "flv": (["h264", "flv1"], ["aac", "mp3"]),
+    "wmv": (["wmv1", "wmv2", "wmv3", "vc1"], ["wmav1", "wmav2"]),
+    "mpeg": (["mpeg1video", "mpeg2video"], ["mp2", "mp3", "ac3"]),
+    "mpg": (["mpeg1video", "mpeg2video"], ["mp2", "mp3", "ac3"]),
+}
+
+# Keep this much of ffmpeg's stderr for error messages
+STDERR_TAIL_LINES = 20
+
+
+def bundle_dir():
+    """Folder holding bundled binaries (PyInstaller or the source folder)"""
+    if getattr(sys, 'frozen', False):
+        return sys._MEIPASS
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def find_tool(name):
+    """Locate ffmpeg or ffprobe, preferring a bundled .exe next to the app"""
+    bundled = os.path.join(bundle_dir(), f"{name}.exe")
+    if os.path.isfile(bundled):
+        return bundled
+    return shutil.which(name)
+
+
+def find_ffmpeg():
+    return find_tool("ffmpeg")
+
+
+def find_ffprobe():
+    return find_tool("ffprobe")
+
+
+class FFmpegError(RuntimeError):
+    """ffmpeg exited with an error; the message holds the end of its log"""
+
+
+def stderr_tail(text, lines=STDERR_TAIL_LINES):
+    return "\n".join(text.strip().splitlines()[-lines:])
+
+
+def thread_args(args, threads):
+    """Limit decoder and encoder threads; args must end with the output file"""
+    if not threads:
+        return args
+    return ["-threads", str(threads)] + args[:-1] + ["-threads", str(threads), args[-1]]
+
+
+def output_threads(threads, output_count):
+    """-threads option for each of output_count outputs encoded side by side
+
+    -threads applies per output, so the job's threads are divided among the
+    encoders instead of each of them starting threads of its own.
+    """
+    if not threads:
+        return []
+    return ["-threads", str(max(1, threads // max(1, output_count)))]
+
+
+def parse_progress(values):
+    """Turn one block of ffmpeg -progress key=value pairs into numbers
+
+    Returns {"time": seconds of output written, "frame", "fps", "speed"
+    (output seconds per second, 2.0 means twice realtime), "done"}; values
+    ffmpeg reports as N/A are None.
+    """
+    def number(key, suffix=""):
+        try:
+            return float(values.get(key, "").strip().rstrip(suffix))
+        except ValueError:
+            return None
+
+    microseconds = number("out_time_us")
+    frame = number("frame")
+    return {
+        "time": max(0.0, microseconds / 1000000) if microseconds is not None else None,
+        "frame": int(frame) if frame is not None else None,
+        "fps": number("fps"),
+        "speed": number("speed", "x"),
+        "done": values.get("progress") == "end",
+    }
+
+
+def read_progress(stream):
+    """Yield parse_progress() of every block ffmpeg writes to a -progress pipe"""
+    values = {}
+    for line in stream:
+        key, separator, value = line.strip().partition("=")
+        if not separator:
+            continue
+        values[key] = value
+        # Every block ends with progress=continue (or progress=end)
+        if key == "progress":
+            yield parse_progress(values)
+            values = {}
+
+
+def run_ffmpeg(args, ffmpeg_path=None, threads=None, on_progress=None):
+    """Run ffmpeg with quiet logging and raise FFmpegError on failure
+
+    With on_progress, ffmpeg's machine-readable -progress output is read
+    as it is written and on_progress(progress) is called about twice a
+    second (see parse_progress). Only the last STDERR_TAIL_LINES lines of
+    stderr are kept, however long the process runs.
+    """
+    command = [ffmpeg_path or find_ffmpeg(), "-hide_banner", "-nostdin", "-loglevel", "error", "-y"]
+    if on_progress:
+        command += ["-progress", "pipe:1"]
+    command += thread_args(args, threads)
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE if on_progress else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace"
+    )
+
+    # stderr is drained on its own thread so neither pipe can fill up and block ffmpeg
+    tail = deque(maxlen=STDERR_TAIL_LINES)
+    reader = threading.Thread(target=tail.extend, args=(process.stderr,), daemon=True)
+    reader.start()
+    try:
+        if on_progress:
+            for progress in read_progress(process.stdout):
+                on_progress(progress)
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        if on_progress:
+            process.stdout.close()
+        process.wait()
+        reader.join()
+        process.stderr.close()
+
+    if process.returncode != 0:
+        raise FFmpegError(stderr_tail("".join(tail)) or f"ffmpeg exited with code {process.returncode}")
+
+
+def probe_media(path, ffprobe_path=None, ffmpeg_path=None):
+    """Read duration and stream codecs of a media file
+
+    Uses ffprobe when it is available and falls back to parsing the header
+    that "ffmpeg -i" prints, since only ffmpeg.exe is bundled on Windows.
+    Returns {"duration": seconds or None, "streams": [...]} where every
+    stream has "type" and "codec" plus sample_rate/channels or width/height.
+    """
+    ffprobe_path = ffprobe_path or find_ffprobe()
+    if ffprobe_path:
+        return probe_with_ffprobe(path, ffprobe_path)
+    return probe_with_ffmpeg(path, ffmpeg_path or find_ffmpeg())
+
+
+def probe_with_ffprobe(path, ffprobe_path):
+    process = subprocess.run(
+        [ffprobe_path, "-v", "error", "-show_format", "-show_streams", "-of", "json", path],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        errors="replace"
+    )
+    if process.returncode != 0:
+        raise FFmpegError(stderr_tail(process.stderr) or f"ffprobe exited with code {process.returncode}")
+
+    data = json.loads(process.stdout or "{}")
+    streams = []
+    for stream in data.get("streams", []):
+        info = {"type": stream.get("codec_type"), "codec": stream.get("codec_name")}
+        if info["type"] == "audio":
+            info["sample_rate"] = int(stream.get("sample_rate") or 0) or None
+            info["channels"] = stream.get("channels")
+        elif info["type"] == "video":
+            info["width"] = stream.get("width")
+            info["height"] = stream.get("height")
+            info["still"] = stream.get("disposition", {}).get("attached_pic") == 1
+        streams.append(info)
+
+    duration = data.get("format", {}).get("duration")
+    return {"duration": float(duration) if duration else None, "streams": streams}
+
+
+# Channel layouts that ffmpeg names instead of numbering; "5.1" or "7.1.4"
+# are counted from their parts and others are printed as "N channels"
+NAMED_LAYOUTS = {"mono": 1, "stereo": 2, "downmix": 2, "binaural": 2, "quad": 4, "hexagonal": 6,
+                 "octagonal": 8, "hexadecagonal": 16}
+
+
+def layout_channels(layout):
+    """Number of channels in a layout from the "ffmpeg -i" header, or None if unknown"""
+    layout = layout.strip()
+    match = re.fullmatch(r"(\d+) channels.*", layout)
+    if match:
+        return int(match.group(1))
+    # Variants such as "5.1(side)" or "quad(side)" have the same count
+    layout = layout.split("(")[0]
+    if re.fullmatch(r"\d+(\.\d+)+", layout):
+        return sum(int(part) for part in layout.split("."))
+    return NAMED_LAYOUTS.get(layout)
+
+
+def probe_with_ffmpeg(path, ffmpeg_path):
+    # ffmpeg exits with an error without an output file, but still prints the header
+    process = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-nostdin", "-i", path],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        errors="replace"
+    )
+    log = process.stderr
+    if "Stream #" not in log:
+        raise FFmpegError(stderr_tail(log) or "Could not read media information")
+
+    duration = None
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", log)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    streams = []
+    for line in log.splitlines():
+        match = re.search(r"Stream #\d+:\d+.*?: (Audio|Video|Subtitle|Data): (\w+)", line)
+        if not match:
+            continue
+        info = {"type": match.group(1).lower(), "codec": match.group(2)}
+        if info["type"] == "audio":
+            rate = re.search(r"(\d+) Hz", line)
+            info["sample_rate"] = int(rate.group(1)) if rate else None
+            layout = re.search(r"\d+ Hz, ([^,]+)", line)
+            info["channels"] = layout_channels(layout.group(1)) if layout else None
+        elif info["type"] == "video":
+            size = re.search(r", (\d{2,5})x(\d{2,5})", line)
+            info["width"], info["height"] = (int(size.group(1)), int(size.group(2))) if size else (None, None)
+            info["still"] = "attached pic" in line
+        streams.append(info)
+
+    return {"duration": duration, "streams": streams}
+
+
+def first_stream(info, stream_type):
+    """Get the first stream of a type ("audio" or "video") from probe_media output"""
+    for stream in info["streams"]:
+        if stream["type"] == stream_type and not stream.get("still"):
+            return stream
+    return None
+
+
+def can_copy_audio(info, target_format):
+    """Check whether the first audio stream can be stored in the target as-is"""
+    stream = first_stream(info, "audio")
+    return stream is not None and stream["codec"] in AUDIO_COPY_CODECS.get(target_format, [])
+
+
+def video_stream_index(info):
+    """Index among the video streams of the first one that is not cover art, or None"""
+    videos = [stream for stream in info["streams"] if stream["type"] == "video"]
+    for index, stream in enumerate(videos):
+        if not stream.get("still"):
+            return index
+    return None
+
+
+def remux_maps(info, target_format):
+    """Get -map options that copy the main video and audio streams into target_format
+
+    Returns None when a stream would need re-encoding for that container.
+    Like ffmpeg's default conversion, only the first video stream (cover
+    art is skipped) and the first audio stream are kept.
+    """
+    video_codecs, audio_codecs = VIDEO_COPY_CODECS.get(target_format, ([], []))
+    videos = [stream for stream in info["streams"] if stream["type"] == "video"]
+    audios = [stream for stream in info["streams"] if stream["type"] == "audio"]
+    index = video_stream_index(info)
+    if index is None or videos[index]["codec"] not in video_codecs:
+        return None
+    if audios and audios[0]["codec"] not in audio_codecs:
+        return None
+
+    # Stream specifiers count per type, so they hold whichever way the streams were probed
+    maps = ["-map", f"0:v:{index}"]
+    if audios:
+        maps += ["-map", "0:a:0"]
+    return maps
+
+
+def audio_output_args(output_file, target_format, copy=False, threads=None):
+    """Options for one audio output of an ffmpeg command (video streams are dropped)"""
+    args = ["-threads", str(threads)] if threads else []
+    if copy:
+        return args + ["-map", "0:a:0", "-c:a", "copy", "-f", AUDIO_CONTAINERS[target_format], output_file]
+    return args + ["-vn", "-sn", "-dn"] + AUDIO_OUTPUT_ARGS[target_format] + [output_file]
+
+
+def audio_copy_args(input_path, output_file, target_format):
+    """Build the arguments for remuxing the first audio stream without re-encoding"""
+    return ["-i", input_path] + audio_output_args(output_file, target_format, copy=True)
+
+
+def audio_transcode_args(input_path, output_file, target_format):
+    """Build the arguments for a single-pass audio transcode"""
+    return ["-i", input_path] + audio_output_args(output_file, target_format)
+
+
+def transcode_audio(input_path, output_file, target_format, ffmpeg_path=None, threads=None):
+    """Decode and encode in one streaming ffmpeg process with constant memory"""
+    run_ffmpeg(audio_transcode_args(input_path, output_file, target_format), ffmpeg_path, threads)
+
+
+def fan_out_audio(input_path, outputs, copy_formats=(), ffmpeg_path=None, threads=None):
+    """Decode once and write every (target_format, output_file) from one ffmpeg process
+
+    Formats in copy_formats get the audio stream copied; the others share
+    a single decode of the input, and the threads between their encoders.
+    """
+    args = (["-threads", str(threads)] if threads else []) + ["-i", input_path]
+    encoder_threads = output_threads(threads, len(outputs) - len(copy_formats))
+    for target_format, output_file in outputs:
+        if target_format in copy_formats:
+            args += audio_output_args(output_file, target_format, copy=True)
+        else:
+            args += encoder_threads + audio_output_args(output_file, target_format)
+    run_ffmpeg(args, ffmpeg_path)
@@ -0,0 +1,138 @@
+import os
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualFileList(ttk.Frame):
+    """Scrollable list of selected files that only builds widgets for visible rows
+
+    A small pool of row widgets is moved and relabelled as the list scrolls,
+    so adding or removing files costs the same for 10 files or 10,000.
+    """
+
+    def __init__(self, parent, on_remove, placeholder="No files selected.",
+                 thumbnails=None, row_height=None, height=150):
+        super().__init__(parent)
+        self.on_remove = on_remove
+        self.thumbnails = thumbnails
+        self.row_height = row_height or (58 if thumbnails else 34)
+        self.items = []
+        self.rows = []
+
+        # Canvas with scrollbar; rows are canvas windows placed by index
+        self.canvas = tk.Canvas(self, bg="#f0f0f0", height=height, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.on_scroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        # Placeholder shown while the list is empty
+        self.placeholder = ttk.Label(
+            self.canvas,
+            text=placeholder,
+            foreground="#888888",
+            font=("Arial", 9)
+        )
+        self.placeholder_item = self.canvas.create_window(10, 20, window=self.placeholder, anchor="nw")
+
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self.bind_wheel(self.canvas)
+
+    def bind_wheel(self, widget):
+        """Scroll the list with the mouse wheel while hovering widget"""
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def on_wheel(self, event):
+        self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def on_scroll(self, first, last):
+        """Keep the scrollbar in sync and rebind rows to the new viewport"""
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def set_items(self, paths):
+        """Show a new list of files, keeping the scroll position where possible"""
+        self.items = list(paths)
+        self.canvas.configure(
+            scrollregion=(0, 0, 0, len(self.items) * self.row_height),
+            yscrollincrement=self.row_height
+        )
+        self.canvas.itemconfigure(self.placeholder_item, state="hidden" if self.items else "normal")
+        self.refresh()
+
+    def create_row(self):
+        """Build one reusable row widget"""
+        frame = ttk.Frame(self.canvas, padding=5, relief="groove", borderwidth=1)
+        row = {"frame": frame, "path": None, "thumb": None}
+
+        if self.thumbnails:
+            row["thumb"] = ttk.Label(frame, width=6, anchor=tk.CENTER)
+            row["thumb"].pack(side=tk.LEFT, padx=(0, 5))
+
+        row["label"] = ttk.Label(frame, width=42 if self.thumbnails else 50, anchor=tk.W)
+        row["label"].pack(side=tk.LEFT, padx=(0, 5))
+
+        ttk.Button(
+            frame,
+            text="X",
+            width=6,
+            command=lambda r=row: r["path"] and self.on_remove(r["path"])
+        ).pack(side=tk.RIGHT)
+
+        for widget in [frame] + frame.winfo_children():
+            self.bind_wheel(widget)
+
+        row["item"] = self.canvas.create_window(0, 0, window=frame, anchor="nw", state="hidden")
+        return row
+
+    def refresh(self):
+        """Bind the row pool to the files currently inside the viewport"""
+        view_height = max(self.canvas.winfo_height(), 1)
+        visible = view_height // self.row_height + 2
+
+        # Grow the pool to cover the viewport; it never shrinks
+        while len(self.rows) < min(visible, len(self.items)):
+            self.rows.append(self.create_row())
+
+        first = max(0, int(self.canvas.canvasy(0)) // self.row_height)
+        width = max(self.canvas.winfo_width() - 4, 1)
+        for offset, row in enumerate(self.rows):
+            index = first + offset
+            if index >= len(self.items):
+                row["path"] = None
+                if self.thumbnails:
+                    self.thumbnails.release(id(row))
+                self.canvas.itemconfigure(row["item"], state="hidden")
+                continue
+
+            self.canvas.coords(row["item"], 0, index * self.row_height)
+            self.canvas.itemconfigure(
+                row["item"], state="normal", width=width, height=self.row_height - 4
+            )
+            path = self.items[index]
+            if row["path"] != path:
+                self.bind_row(row, path)
+
+    def bind_row(self, row, path):
+        """Point a pooled row at a different file"""
+        row["path"] = path
+        row["label"].config(text=os.path.basename(path))
+        if not row["thumb"]:
+            return
+
+        row["thumb"].config(image="", text="...")
+        self.thumbnails.request(
+            path, lambda p, photo, r=row: self.set_thumbnail(r, p, photo), owner=id(row)
+        )
+
+    def set_thumbnail(self, row, path, photo):
+        """Show a decoded thumbnail if the row still shows that file"""
+        if row["path"] != path:
+            return
+        if photo is None:
+            row["thumb"].config(image="", text="?")
+        else:
+            row["thumb"].config(image=photo, text="")
+            row["thumb"].image = photo  # Keep a reference so Tk does not drop the image
@@ -1,8 +1,415 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Scrollbar
-from PIL import Image, ImageTk
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import math
 import os
 import sys
+from resource_usage import peak_rss_bytes, format_megabytes
+from batch_journal import BatchJournal, atomic_output, open_journal, unique_output_name
+from conversion_cache import default_cache_dir, open_cache, store_in_cache
+from thumbnails import ThumbnailLoader
+from file_list import VirtualFileList
+from codec_registry import available_codecs, codec_for_format, ensure_codec, ensure_codecs_for
+
+
+# Supported formats
+IMAGE_FORMATS = ["PNG", "JPG", "JPEG", "ICO", "BMP", "WEBP", "HEIC", "HEIF"]
+
+# Encoder settings per preset and output format (measured trade-offs are in the README).
+# "Balanced" matches the settings used before presets existed, plus lossless JPEG optimize.
+ENCODER_PRESETS = {
+    "Fastest": {
+        "webp": {"lossless": True, "method": 0, "quality": 0},
+        "png": {"compress_level": 1},
+        "jpeg": {"quality": 75, "optimize": False, "subsampling": 2},
+    },
+    "Balanced": {
+        "webp": {"lossless": True, "method": 4, "quality": 80},
+        "png": {"compress_level": 6},
+        "jpeg": {"quality": 75, "optimize": True, "subsampling": 2},
+    },
+    "Smallest": {
+        "webp": {"lossless": True, "method": 6, "quality": 100},
+        "png": {"compress_level": 9, "optimize": True},
+        "jpeg": {"quality": 75, "optimize": True, "progressive": True, "subsampling": 2},
+    },
+}
+
+DEFAULT_PRESET = "Balanced"
+
+# Bytes Pillow allocates per pixel for each image mode (3 band images are padded to 4)
+MODE_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2}
+
+# Extra bytes per pixel encoders allocate next to the image, by preset (measured
+# with Pillow 12.3): lossless WEBP keeps per-pixel hash chains and backward
+# references, and an optimized JPEG holds every coefficient for its second pass
+ENCODER_OVERHEAD = {
+    "Fastest": {"webp": 23, "heic": 4, "heif": 4},
+    "Balanced": {"webp": 39, "jpeg": 4, "heic": 4, "heif": 4},
+    "Smallest": {"webp": 57, "jpeg": 4, "heic": 4, "heif": 4},
+}
+
+# Bytes an encoder needs whatever the image size (lossless WEBP's hash tables,
+# PNG's zlib window and row filter buffers)
+ENCODER_FIXED_BYTES = {"webp": 8 * 1024 * 1024, "png": 1024 * 1024}
+
+# Output formats that cannot store transparency
+ALPHA_FREE_FORMATS = ["jpg", "jpeg", "bmp"]
+
+# Rawmodes that can be decoded straight into RGB by skipping the alpha byte
+ALPHA_RAWMODES = {"RGBA": "RGBX", "BGRA": "BGRX"}
+
+# Modes whose pixels cannot be averaged: reduce() rejects them and resize() falls
+# back to nearest neighbour, so they are shrunk in these modes instead
+# (palette images with transparency become RGBA)
+RESAMPLE_MODES = {"1": "L", "P": "RGB", "PA": "RGBA"}
+
+# 16-bit grayscale has no reduce(), but resize() averages it directly
+RESIZE_ONLY_MODES = ["I;16", "I;16B", "I;16L", "I;16N"]
+
+# While an image that does not fit is decoded strip by strip, this share of the
+# memory budget is kept for the full-resolution strip and its resampled copy,
+# and the same again for the decoder's and encoder's own buffers
+STRIP_BUDGET_SHARE = 16
+
+# Source pixels the LANCZOS filter reads on each side, per output pixel
+LANCZOS_SUPPORT = 3
+
+# Bytes per pixel of uncompressed rawmodes that can be decoded strip by strip
+RAW_STRIP_BYTES = {"L": 1, "RGB": 3, "BGR": 3, "RGBA": 4, "BGRA": 4, "RGBX": 4, "BGRX": 4}
+
+
+class MemoryBudgetError(Exception):
+    """Raised when an image cannot be converted within the memory budget"""
+
+
+def get_encoder_options(output_format, preset=DEFAULT_PRESET):
+    """Get the Pillow save() arguments for an output format under an encoder preset"""
+    if output_format == "jpg":
+        output_format = "jpeg"
+    options = ENCODER_PRESETS.get(preset, ENCODER_PRESETS[DEFAULT_PRESET])
+    return dict(options.get(output_format, {}))
+
+
+def fit_size(size, max_dimension):
+    """Scale (width, height) down so the longest side is at most max_dimension"""
+    width, height = size
+    scale = max_dimension / max(width, height)
+    if scale >= 1:
+        return size
+    return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+
+def frame_bytes(img):
+    """Memory needed to hold the decoded image"""
+    return img.width * img.height * MODE_BYTES.get(img.mode, 4)
+
+
+def tile_rawmode(tile):
+    """Get the rawmode from a decoder tile, whatever shape its arguments have"""
+    args = tile[3]
+    return args[0] if isinstance(args, tuple) else args
+
+
+def can_decode_without_alpha(img):
+    """Check whether the decoder can drop the alpha band itself"""
+    return img.mode == "RGBA" and bool(img.tile) and all(
+        tile[0] in ("zip", "raw") and tile_rawmode(tile) in ALPHA_RAWMODES
+        for tile in img.tile
+    )
+
+
+def decode_without_alpha(img):
+    """Make the decoder write RGB directly, so dropping alpha needs no second frame"""
+    tiles = []
+    for codec, extents, offset, args in img.tile:
+        if isinstance(args, tuple):
+            args = (ALPHA_RAWMODES[args[0]],) + tuple(args[1:])
+        else:
+            args = ALPHA_RAWMODES[args]
+        tiles.append((codec, extents, offset, args))
+    img.tile = tiles
+    
+    # Plugins set the mode through _mode on current Pillow releases
+    if hasattr(img, "_mode"):
+        img._mode = "RGB"
+    else:
+        img.mode = "RGB"
+
+
+def estimate_memory(img, output_format, preset=DEFAULT_PRESET):
+    """Estimate the peak memory of converting an opened (not yet decoded) image"""
+    pixels = img.width * img.height
+    needed = frame_bytes(img)
+    
+    # Dropping transparency makes a full RGB copy unless the decoder can do it
+    if output_format in ALPHA_FREE_FORMATS and img.mode in ("RGBA", "P"):
+        if not can_decode_without_alpha(img):
+            needed += pixels * 4
+    elif img.mode in RESAMPLE_MODES:
+        # Shrinking first converts the frame to a mode that can be averaged
+        needed += pixels * MODE_BYTES.get(RESAMPLE_MODES[img.mode], 4)
+    
+    encoder_format = "jpeg" if output_format == "jpg" else output_format
+    overhead = ENCODER_OVERHEAD.get(preset, ENCODER_OVERHEAD[DEFAULT_PRESET])
+    return needed + pixels * overhead.get(encoder_format, 0)
+
+
+def raw_strip_layout(img):
+    """Return (offset, rawmode, stride, orientation) for uncompressed single tile images"""
+    if len(img.tile) != 1 or img.mode not in ("L", "RGB", "RGBA"):
+        return None
+    
+    codec, extents, offset, args = img.tile[0]
+    if codec != "raw" or tuple(extents) != (0, 0) + img.size:
+        return None
+    
+    if not isinstance(args, tuple):
+        args = (args,)
+    rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+    if rawmode not in RAW_STRIP_BYTES:
+        return None
+    
+    stride = stride or img.width * RAW_STRIP_BYTES[rawmode]
+    return offset, rawmode, stride, orientation or 1
+
+
+def resamplable(img):
+    """Convert palette and bilevel images to a mode whose pixels can be averaged"""
+    mode = RESAMPLE_MODES.get(img.mode)
+    if mode is None:
+        return img
+    if mode == "RGB" and "transparency" in img.info:
+        mode = "RGBA"
+    return img.convert(mode)
+
+
+def resize_in_strips(input_path, img, layout, target, strip_budget):
+    """Decode an uncompressed image a strip at a time, resampling each strip into target
+
+    Only the output frame and one strip of the full resolution image are
+    ever held in memory. Every strip also decodes the rows the filter reads
+    beyond its edges, so the result matches resizing the whole image.
+    """
+    offset, rawmode, stride, orientation = layout
+    width, height = img.size
+    target_width, target_height = target
+    scale = height / target_height
+    margin = math.ceil(LANCZOS_SUPPORT * scale) + 1
+    
+    # A strip is held twice: decoded, and resampled across before it is resampled down
+    row_bytes = width * MODE_BYTES.get(img.mode, 4)
+    output_rows = max(1, int((strip_budget // (2 * row_bytes) - 2 * margin) / scale))
+    
+    resized = Image.new(img.mode, target)
+    for output_top in range(0, target_height, output_rows):
+        output_bottom = min(target_height, output_top + output_rows)
+        box_top, box_bottom = output_top * scale, output_bottom * scale
+        top = max(0, int(box_top) - margin)
+        strip_height = min(height, math.ceil(box_bottom) + margin) - top
+        
+        # Bottom-up files (BMP, TGA) store the last row first
+        if orientation < 0:
+            strip_offset = offset + (height - top - strip_height) * stride
+        else:
+            strip_offset = offset + top * stride
+        
+        with Image.open(input_path) as strip:
+            strip._size = (width, strip_height)
+            strip.tile = [("raw", (0, 0, width, strip_height), strip_offset, (rawmode, stride, orientation))]
+            strip.load()
+            part = strip.resize(
+                (target_width, output_bottom - output_top), Image.LANCZOS,
+                box=(0, box_top - top, width, box_bottom - top)
+            )
+            resized.paste(part, (0, output_top))
+    
+    return resized
+
+
+def jpeg_draft_size(img, target, memory_budget=None):
+    """Size to ask draft() for, so the DCT-scaled frame also fits the memory budget
+
+    draft() decodes at the smallest scale (1/2, 1/4 or 1/8) that still
+    covers target. When that frame is over the budget, the largest scale
+    whose frame fits is asked for instead and the final resize makes up the
+    difference. Past 1/8 prepare_image reports the image as too big.
+    """
+    if not memory_budget:
+        return target
+    pixel_bytes = MODE_BYTES.get(img.mode, 4)
+    for scale in (1, 2, 4, 8):
+        smaller = (img.width // (scale * 2), img.height // (scale * 2))
+        if scale < 8 and smaller[0] >= target[0] and smaller[1] >= target[1]:
+            continue  # draft() goes at least one scale further for target anyway
+        decoded = (-(-img.width // scale), -(-img.height // scale))
+        if scale == 8 or decoded[0] * decoded[1] * pixel_bytes <= memory_budget:
+            # draft() divides the original size by the requested one, so round down
+            return (max(1, img.width // scale), max(1, img.height // scale))
+
+
+def prepare_image(input_path, img, output_format, max_dimension=None, memory_budget=None,
+                  preset=DEFAULT_PRESET):
+    """Decode an opened image, shrinking it while it is being decoded when asked to
+
+    JPEG files are decoded with DCT scaling (draft mode), so only 1/2, 1/4 or
+    1/8 of the pixels are ever produced. Any remaining large factor is removed
+    with a cheap integer box reduce before the final high quality resize.
+    
+    With a memory budget (in bytes) the output is downscaled until it fits.
+    Uncompressed images whose full frame does not fit are resampled strip by
+    strip straight to the output size; other images that cannot be decoded
+    within the budget raise MemoryBudgetError.
+    Returns the image and a note describing any budget downscale.
+    """
+    budget_limited = False
+    target = fit_size(img.size, max_dimension) if max_dimension else img.size
+    in_strips = memory_budget and frame_bytes(img) > memory_budget
+    
+    if memory_budget:
+        # Work out the largest output that still fits into the budget,
+        # next to the strip when the full frame has to be decoded in strips
+        needed = estimate_memory(img, output_format, preset)
+        available = memory_budget - 2 * (memory_budget // STRIP_BUDGET_SHARE) if in_strips else memory_budget
+        available -= ENCODER_FIXED_BYTES.get(output_format, 0)
+        if needed > available:
+            scale = (max(0, available) / needed) ** 0.5
+            budget_target = fit_size(img.size, max(1, int(max(img.size) * scale)))
+            if budget_target[0] < target[0]:
+                target = budget_target
+                budget_limited = True
+    
+    if target == img.size:
+        # Drop alpha in the decoder instead of copying the full frame afterwards
+        if memory_budget and output_format in ALPHA_FREE_FORMATS and can_decode_without_alpha(img):
+            decode_without_alpha(img)
+        return img, None
+    
+    # Let the JPEG decoder skip pixels we would throw away anyway
+    if img.format == "JPEG":
+        img.draft(img.mode, jpeg_draft_size(img, target, memory_budget))
+    
+    note = None
+    if budget_limited:
+        note = f"downscaled to {target[0]}x{target[1]} to fit the memory budget"
+    
+    if in_strips and frame_bytes(img) > memory_budget:
+        # The full frame does not fit (not even drafted), so decode and resample it strip by strip
+        layout = raw_strip_layout(img)
+        if layout is None:
+            raise MemoryBudgetError(
+                f"{img.width}x{img.height} {img.format} image needs more than the "
+                f"{memory_budget // (1024 * 1024)} MB memory budget and cannot be decoded in strips"
+            )
+        return resize_in_strips(input_path, img, layout, target, memory_budget // STRIP_BUDGET_SHARE), note
+    
+    # Integer reduce while keeping at least 2x headroom for the final resample
+    factor = int(min(img.width / target[0], img.height / target[1]) / 2)
+    if factor >= 2 and img.mode not in RESIZE_ONLY_MODES:
+        img = resamplable(img).reduce(factor)
+    return resamplable(img).resize(target, Image.LANCZOS), note
+
+
+def convert_image_file(input_path, output_file, output_format, max_dimension=None,
+                       memory_budget=None, cache_dir=None, preset=DEFAULT_PRESET):
+    """Convert a single image file (runs inside a worker process)
+
+    Kept at module level so it can be pickled and sent to the process pool.
+    Returns a dict describing the result; errors are raised to the caller.
+    """
+    result = {
+        "input": input_path,
+        "output": output_file,
+        "format": output_format,
+        "warning": None,
+        "note": None,
+        "memory_used": None,
+        "cached": False,
+    }
+    
+    # Reuse an earlier conversion of the same content with the same settings
+    cache = open_cache(cache_dir) if cache_dir else None
+    if cache is None:
+        save_image_file(result, max_dimension, memory_budget, preset)
+        return result
+    
+    try:
+        options = {
+            "max_dimension": max_dimension,
+            "memory_budget": memory_budget,
+            "encoder": get_encoder_options(output_format, preset),
+        }
+        key = cache.make_key(input_path, output_format, options)
+        if cache.fetch(key, output_file):
+            result["cached"] = True
+            return result
+        
+        save_image_file(result, max_dimension, memory_budget, preset)
+        
+        # Fallback outputs (PNG instead of HEIF) are not what was asked for
+        if not result["warning"]:
+            store_in_cache(cache, key, output_file)
+    finally:
+        cache.close()
+    
+    return result
+
+
+def save_image_file(result, max_dimension=None, memory_budget=None, preset=DEFAULT_PRESET):
+    """Decode, convert and save the image described by a result dict"""
+    input_path = result["input"]
+    output_file = result["output"]
+    output_format = result["format"]
+    
+    # The memory budget replaces Pillow's decompression bomb limit
+    if memory_budget:
+        Image.MAX_IMAGE_PIXELS = None
+    
+    # Optional plugins (HEIF) must be registered before the input is opened
+    ensure_codecs_for(input_path)
+    
+    # Memory is measured from here, with the plugins' code already loaded, so
+    # it shows what this image needed and not the interpreter
+    Image.init()
+    start_peak = peak_rss_bytes()
+    
+    with Image.open(input_path) as img:
+        # Downscale during decode when a maximum size or memory budget is set
+        img, result["note"] = prepare_image(
+            input_path, img, output_format, max_dimension, memory_budget, preset
+        )
+        
+        # Handle transparency for formats that don't support it
+        if output_format in ALPHA_FREE_FORMATS and img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
+        
+        # Handle special formats; other formats get the preset's encoder settings
+        encoder_options = get_encoder_options(output_format, preset)
+        save_format = None  # Taken from the file extension
+        if output_format == "webp":
+            # Save with lossless compression for transparency
+            save_format = "WEBP"
+        elif output_format in ["heic", "heif"]:
+            encoder_options = {}
+            # HEIC/HEIF requires pillow-heif library
+            if ensure_codec("heif"):
+                # Save as HEIF format
+                save_format = "HEIF"
+            else:
+                # Fall back to PNG if pillow-heif not available
+                result["output"] = os.path.splitext(output_file)[0] + ".png"
+                result["format"] = "png"
+                result["warning"] = "pillow-heif library not found. HEIC/HEIF files will be saved as PNG."
+        
+        # Written under a temporary name so an interrupted save never looks complete
+        with atomic_output(result["output"]) as temp_file:
+            img.save(temp_file, save_format, **encoder_options)
+    
+    end_peak = peak_rss_bytes()
+    if start_peak is not None and end_peak is not None:
+        result["memory_used"] = end_peak - start_peak
+
 
 class ImageConverter:
     def __init__(self, root, main_root):
@@ -14,10 +421,18 @@ class ImageConverter:
         self.set_app_icon()
         
         # Supported formats
-        self.formats = ["PNG", "JPG", "JPEG", "ICO", "BMP", "WEBP", "HEIC", "HEIF"]
+        self.formats = list(IMAGE_FORMATS)
         self.input_paths = []
         self.output_path = ""
-        self.MAX_FILES = 20
+        self.max_sizes = ["Original", "64", "128", "256", "512", "1024", "1920", "2048"]
+        self.memory_budgets = ["Unlimited", "256 MB", "512 MB", "1024 MB", "2048 MB", "4096 MB"]
+        self.executor = None
+        self.pending = {}
+        self.journal = None
+        
+        # Thumbnails are decoded in the background and cached in memory and on disk
+        self.thumbnails = ThumbnailLoader(self.root)
+        self.root.bind("<Destroy>", self.on_destroy)
         
         # Create UI elements
         self.create_widgets()
@@ -126,25 +541,14 @@ class ImageConverter:
         preview_frame = ttk.Frame(input_frame)
         preview_frame.pack(fill=tk.X, pady=(5, 10))
         
-        # Create container for preview with scrollable canvas
-        preview_container = ttk.Frame(preview_frame)
-        preview_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create canvas with scrollbar
-        self.canvas = tk.Canvas(preview_container, bg="#f0f0f0", height=150)
-        scrollbar = ttk.Scrollbar(preview_container, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas, style="Preview.TFrame")
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Virtualized file list; only the visible rows have widgets
+        self.file_list = VirtualFileList(
+            preview_frame,
+            on_remove=self.remove_image,
+            placeholder="No files selected. Click 'Browse Images' to add files.",
+            thumbnails=self.thumbnails
         )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.file_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Selected files label
         self.files_label = ttk.Label(
@@ -203,14 +607,81 @@ class ImageConverter:
         )
         self.folder_entry.pack(side=tk.LEFT, padx=5)
         
-        # Convert button
+        # Reuse results of earlier identical conversions
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            folder_frame,
+            text="Reuse cached results",
+            variable=self.use_cache_var
+        ).pack(side=tk.RIGHT)
+        
+        # Resize options frame
+        resize_frame = ttk.Frame(output_frame)
+        resize_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        
+        # Maximum output size (longest side in pixels)
+        ttk.Label(resize_frame, text="Max size (px):").pack(side=tk.LEFT)
+        self.max_size_var = tk.StringVar()
+        self.max_size_combo = ttk.Combobox(
+            resize_frame,
+            textvariable=self.max_size_var,
+            values=self.max_sizes,
+            state="readonly",
+            width=10
+        )
+        self.max_size_combo.current(0)
+        self.max_size_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Per-file memory budget for very large images
+        ttk.Label(resize_frame, text="Memory budget:").pack(side=tk.LEFT, padx=(10, 0))
+        self.memory_budget_var = tk.StringVar()
+        self.memory_budget_combo = ttk.Combobox(
+            resize_frame,
+            textvariable=self.memory_budget_var,
+            values=self.memory_budgets,
+            state="readonly",
+            width=10
+        )
+        self.memory_budget_combo.current(0)
+        self.memory_budget_combo.pack(side=tk.LEFT, padx=5)
+        
+        # Encoder speed/size preset
+        preset_frame = ttk.Frame(output_frame)
+        preset_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(preset_frame, text="Encoder preset:").pack(side=tk.LEFT)
+        self.preset_var = tk.StringVar(value=DEFAULT_PRESET)
+        self.preset_combo = ttk.Combobox(
+            preset_frame,
+            textvariable=self.preset_var,
+            values=list(ENCODER_PRESETS),
+            state="readonly",
+            width=10
+        )
+        self.preset_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            preset_frame,
+            text="(affects WEBP, PNG and JPG output)",
+            foreground="#555555"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Convert and resume buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=20)
         self.convert_btn = ttk.Button(
-            main_frame,
+            button_frame,
             text="CONVERT IMAGES",
             command=self.convert_images,
             state="disabled"
         )
-        self.convert_btn.pack(pady=20)
+        self.convert_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Continues the last batch that was interrupted, skipping finished files
+        self.resume_btn = ttk.Button(
+            button_frame,
+            text="RESUME",
+            command=self.resume_batch
+        )
+        self.resume_btn.pack(side=tk.LEFT, padx=5)
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -223,6 +694,12 @@ class ImageConverter:
         )
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
     
+    def on_destroy(self, event):
+        """Stop background work when the window is closed"""
+        if event.widget is self.root:
+            self.thumbnails.close()
+            self.shutdown_executor()
+    
     def navigate(self, converter_name):
         """Handle navigation between converters"""
         if converter_name == "Main Menu":
@@ -291,17 +768,18 @@ class ImageConverter:
                 f"No valid {source_format.upper()} files selected!"
             )
             return
-            
-        # Add new files to existing selection
-        new_paths = list(set(self.input_paths + valid_paths))
-        
-        # Limit to MAX_FILES
-        if len(new_paths) > self.MAX_FILES:
-            new_paths = new_paths[:self.MAX_FILES]
-            messagebox.showwarning(
-                "File Limit", 
-                f"Maximum {self.MAX_FILES} files allowed. Only first {self.MAX_FILES} will be processed."
+        
+        # Formats such as HEIC can only be read when their plugin is installed
+        codec = codec_for_format(source_format)
+        if codec and not available_codecs()[codec]:
+            messagebox.showerror(
+                "Dependency Missing",
+                f"pillow-heif library not found. {source_format.upper()} files cannot be read."
             )
+            return
+            
+        # Add new files to existing selection, keeping the original order
+        new_paths = list(dict.fromkeys(self.input_paths + valid_paths))
         
         self.input_paths = new_paths
         self.process_files()
@@ -320,76 +798,9 @@ class ImageConverter:
             messagebox.showerror("Error", f"Could not load images:\n{str(e)}")
             self.status_var.set(f"Error loading images: {str(e)}")
     
-    def clear_previews(self):
-        """Clear existing previews"""
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-    
     def show_previews(self):
-        """Display preview for all images with remove buttons"""
-        try:
-            # Clear existing previews
-            self.clear_previews()
-            
-            # Only show if there are files
-            if not self.input_paths:
-                # Add placeholder text when no files
-                placeholder = ttk.Label(
-                    self.scrollable_frame,
-                    text="No files selected. Click 'Browse Images' to add files.",
-                    foreground="#888888",
-                    font=("Arial", 9)
-                )
-                placeholder.pack(pady=20)
-                return
-            
-            # Configure for file list
-            for i, file_path in enumerate(self.input_paths):
-                # Create file container
-                file_frame = ttk.Frame(
-                    self.scrollable_frame,
-                    padding=5,
-                    relief="groove",
-                    borderwidth=1
-                )
-                file_frame.pack(fill=tk.X, padx=5, pady=2)
-                file_frame.file_path = file_path  # Store file path in frame
-                
-                # Filename with remove button
-                filename = os.path.basename(file_path)
-                
-                # Filename and remove button container
-                bottom_frame = ttk.Frame(file_frame)
-                bottom_frame.pack(fill=tk.X, expand=True)
-                
-                # Filename label
-                ttk.Label(
-                    bottom_frame,
-                    text=filename,
-                    width=50,
-                    anchor=tk.W
-                ).pack(side=tk.LEFT, padx=(0, 5))
-                
-                # Remove button
-                remove_btn = ttk.Button(
-                    bottom_frame,
-                    text="X",
-                    width=6,
-                    command=lambda f=file_path: self.remove_image(f)
-                )
-                remove_btn.pack(side=tk.RIGHT)
-            
-            # Update canvas scroll region
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            
-        except Exception as e:
-            # Create error label if preview fails
-            error_label = ttk.Label(
-                self.scrollable_frame,
-                text=f"Preview Error: {str(e)}",
-                foreground="red"
-            )
-            error_label.pack()
+        """Show the selected files in the file list"""
+        self.file_list.set_items(self.input_paths)
     
     def remove_image(self, file_path):
         """Remove a specific image from the selection"""
@@ -406,7 +817,87 @@ class ImageConverter:
             self.path_var.set(path)
             self.status_var.set(f"Output path set to: {path}")
     
-    def convert_images(self):
+    def get_worker_count(self, total_files):
+        """Size the process pool to the machine, but never larger than the batch"""
+        return max(1, min(os.cpu_count() or 1, total_files))
+    
+    def get_max_dimension(self):
+        """Get the selected maximum output size, or None to keep the original"""
+        value = self.max_size_var.get()
+        return int(value) if value.isdigit() else None
+    
+    def get_memory_budget(self):
+        """Get the selected per-file memory budget in bytes, or None for no limit"""
+        value = self.memory_budget_var.get().split()[0]
+        return int(value) * 1024 * 1024 if value.isdigit() else None
+    
+    def create_executor(self, total_files, memory_budget):
+        """Create the worker pool for a batch"""
+        workers = self.get_worker_count(total_files)
+        if not memory_budget:
+            return ProcessPoolExecutor(max_workers=workers)
+        
+        # A fresh process per file starts each one from a low high-water mark, so the memory used is its own
+        try:
+            return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+        except TypeError:
+            # max_tasks_per_child needs Python 3.11
+            return ProcessPoolExecutor(max_workers=workers)
+    
+    def get_settings(self):
+        """Current conversion settings, stored in the batch journal"""
+        return {
+            "source_format": self.source_format_var.get(),
+            "target_format": self.target_format_var.get(),
+            "output_path": self.output_path,
+            "create_folder": self.create_folder_var.get(),
+            "folder_name": self.folder_var.get(),
+            "use_cache": self.use_cache_var.get(),
+            "max_size": self.max_size_var.get(),
+            "memory_budget": self.memory_budget_var.get(),
+            "preset": self.preset_var.get(),
+        }
+    
+    def apply_settings(self, settings):
+        """Restore the settings of a journaled batch"""
+        self.source_format_var.set(settings["source_format"])
+        self.target_format_var.set(settings["target_format"])
+        self.output_path = settings["output_path"]
+        self.path_var.set(self.output_path)
+        self.create_folder_var.set(settings["create_folder"])
+        self.folder_var.set(settings["folder_name"])
+        self.toggle_folder_entry()
+        self.use_cache_var.set(settings["use_cache"])
+        self.max_size_var.set(settings["max_size"])
+        self.memory_budget_var.set(settings["memory_budget"])
+        self.preset_var.set(settings["preset"])
+    
+    def resume_batch(self):
+        """Continue the last interrupted batch with its settings, skipping finished files"""
+        if self.executor is not None:
+            return
+        journal = BatchJournal.latest("image")
+        if journal is None:
+            messagebox.showinfo("Resume", "There is no interrupted image batch to resume.")
+            return
+        
+        if not messagebox.askyesno(
+            "Resume",
+            f"Resume the batch of {len(journal.inputs)} images started {journal.started()}?\n\n"
+            f"{journal.completed_count()} images are already converted and will be skipped."
+        ):
+            return
+        
+        try:
+            self.apply_settings(journal.settings)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not restore the batch settings:\n{str(e)}")
+            return
+        self.input_paths = list(journal.inputs)
+        self.process_files()
+        self.convert_images(journal)
+    
+    def convert_images(self, journal=None):
         """Convert multiple images to selected format"""
         if not self.input_paths:
             messagebox.showerror("Error", "No images selected!")
@@ -436,73 +927,151 @@ class ImageConverter:
                 os.makedirs(output_dir)
                 self.status_var.set(f"Created folder: {os.path.basename(output_dir)}")
             
-            # Convert images
-            success_count = 0
-            error_count = 0
+            # Hand every file to the process pool; results are collected in poll_conversion
             total_files = len(self.input_paths)
-            
-            for i, input_path in enumerate(self.input_paths):
-                filename = os.path.splitext(os.path.basename(input_path))[0]
+            max_dimension = self.get_max_dimension()
+            memory_budget = self.get_memory_budget()
+            cache_dir = default_cache_dir() if self.use_cache_var.get() else None
+            # The journal records finished files so an interrupted batch can be resumed
+            self.journal = journal or open_journal("image", self.get_settings(), self.input_paths)
+            self.executor = self.create_executor(total_files, memory_budget)
+            self.pending = {}
+            resumed = 0
+            taken_names = set()
+            for input_path in self.input_paths:
+                # Inputs with the same name from different folders are numbered,
+                # in input order so a resumed batch names them the same
+                filename = unique_output_name(os.path.splitext(os.path.basename(input_path))[0], taken_names)
+                # Files whose output was verified by the journal are not converted again
+                if self.journal and self.journal.is_complete(input_path):
+                    resumed += 1
+                    continue
                 output_file = os.path.join(output_dir, f"{filename}.{output_format}")
-                
-                self.status_var.set(f"Processing {i+1}/{total_files}: {filename}")
-                self.root.update()  # Update UI for progress
-                
-                try:
-                    img = Image.open(input_path)
-                    
-                    # Handle transparency for formats that don't support it
-                    if output_format in ["jpg", "jpeg", "bmp"] and img.mode in ("RGBA", "P"):
-                        img = img.convert("RGB")
-                    
-                    # Handle special formats
-                    if output_format == "webp":
-                        # Save with lossless compression for transparency
-                        img.save(output_file, "WEBP", lossless=True)
-                    elif output_format in ["heic", "heif"]:
-                        # HEIC/HEIF requires pillow-heif library
-                        try:
-                            from pillow_heif import register_heif_opener, register_avif_opener
-                            register_heif_opener()
-                            register_avif_opener()
-                            
-                            # Save as HEIF format
-                            img.save(output_file, "HEIF")
-                        except ImportError:
-                            # Fall back to PNG if pillow-heif not available
-                            messagebox.showwarning(
-                                "Dependency Missing",
-                                "pillow-heif library not found. HEIC/HEIF files will be saved as PNG."
-                            )
-                            img.save(os.path.join(output_dir, f"{filename}.png"))
-                            output_format = "png"  # Update format for success message
-                    else:
-                        # Save other formats normally
-                        img.save(output_file)
-                    
-                    success_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    # Special message for HEIC/HEIF if pillow-heif is missing
-                    if output_format in ["heic", "heif"] and "HEIF" in str(e):
-                        self.status_var.set(f"Error converting {filename}: pillow-heif required for HEIC/HEIF conversion")
-                    else:
-                        self.status_var.set(f"Error converting {filename}: {str(e)}")
-            
-            # Show summary
-            messagebox.showinfo(
-                "Conversion Complete", 
-                f"Processed {total_files} images\n\n"
-                f"Success: {success_count}\n"
-                f"Errors: {error_count}\n\n"
-                f"Files saved to: {output_dir}\n\n"
-                "You can convert the same files again or remove them individually."
-            )
+                future = self.executor.submit(
+                    convert_image_file, input_path, output_file, output_format,
+                    max_dimension, memory_budget, cache_dir, self.preset_var.get()
+                )
+                self.pending[future] = input_path
             
-            # Update status
-            self.status_var.set(f"Converted {success_count} images to {output_format.upper()}")
+            self.batch = {
+                "total": total_files,
+                "done": resumed,
+                "success": resumed,
+                "errors": 0,
+                "warnings": set(),
+                "output_dir": output_dir,
+                "output_format": output_format,
+                "memory_budget": memory_budget,
+                "memory_used": None,
+                "downscaled": 0,
+                "cached": 0,
+                "resumed": resumed,
+            }
+            self.convert_btn.config(state="disabled")
+            self.status_var.set(f"Processing 0/{total_files} images...")
+            self.root.after(100, self.poll_conversion)
             
         except Exception as e:
+            self.shutdown_executor()
             messagebox.showerror("Conversion Error", f"An error occurred:\n{str(e)}")
-            self.status_var.set(f"Error: {str(e)}")
\ No newline at end of file
+            self.status_var.set(f"Error: {str(e)}")
+    
+    def poll_conversion(self):
+        """Collect finished jobs from the process pool and stream them to the UI"""
+        try:
+            if not self.root.winfo_exists():
+                self.shutdown_executor()
+                return
+        except tk.TclError:
+            # Window was closed while converting
+            self.shutdown_executor()
+            return
+        
+        batch = self.batch
+        for future in [f for f in self.pending if f.done()]:
+            input_path = self.pending.pop(future)
+            filename = os.path.splitext(os.path.basename(input_path))[0]
+            batch["done"] += 1
+            
+            try:
+                result = future.result()
+                batch["success"] += 1
+                if self.journal:
+                    self.journal.mark_done(input_path, [result["output"]])
+                if result["warning"]:
+                    batch["warnings"].add(result["warning"])
+                    batch["output_format"] = result["format"]  # Update format for success message
+                
+                # Track memory use so it can be checked against the budget
+                message = f"Processed {batch['done']}/{batch['total']}: {filename}"
+                if result["cached"]:
+                    batch["cached"] += 1
+                    message += " (from cache)"
+                elif batch["memory_budget"]:
+                    if result["memory_used"] is not None:
+                        batch["memory_used"] = max(batch["memory_used"] or 0, result["memory_used"])
+                    message += f" (used {format_megabytes(result['memory_used'])})"
+                if result["note"]:
+                    batch["downscaled"] += 1
+                    message += f" - {result['note']}"
+                self.status_var.set(message)
+            except Exception as e:
+                batch["errors"] += 1
+                if self.journal:
+                    self.journal.mark_failed(input_path, e)
+                # Special message for HEIC/HEIF if pillow-heif is missing
+                if batch["output_format"] in ["heic", "heif"] and "HEIF" in str(e):
+                    self.status_var.set(f"Error converting {filename}: pillow-heif required for HEIC/HEIF conversion")
+                else:
+                    self.status_var.set(f"Error converting {filename}: {str(e)}")
+        
+        if self.pending:
+            self.root.after(100, self.poll_conversion)
+            return
+        
+        self.finish_conversion()
+    
+    def finish_conversion(self):
+        """Shut down the pool and show the batch summary"""
+        self.shutdown_executor()
+        batch = self.batch
+        # Keep the journal of a batch with errors so Resume retries just the failed files
+        if self.journal and not batch["errors"]:
+            self.journal.finish()
+        self.journal = None
+        self.convert_btn.config(state="normal" if self.input_paths else "disabled")
+        
+        for warning in batch["warnings"]:
+            messagebox.showwarning("Dependency Missing", warning)
+        
+        # Report memory use when a budget was set
+        memory_text = ""
+        if batch["memory_budget"]:
+            memory_text = (
+                f"Most memory used by one file: {format_megabytes(batch['memory_used'])} "
+                f"(budget {format_megabytes(batch['memory_budget'])})\n"
+                f"Downscaled to fit budget: {batch['downscaled']}\n\n"
+            )
+        
+        # Show summary
+        messagebox.showinfo(
+            "Conversion Complete", 
+            f"Processed {batch['total']} images\n\n"
+            f"Success: {batch['success']}\n"
+            f"Errors: {batch['errors']}\n"
+            f"Reused from cache: {batch['cached']}\n"
+            f"Already converted before resuming: {batch['resumed']}\n\n"
+            + memory_text +
+            f"Files saved to: {batch['output_dir']}\n\n"
+            "You can convert the same files again or remove them individually."
+        )
+        
+        # Update status
+        self.status_var.set(f"Converted {batch['success']} images to {batch['output_format'].upper()}")
+    
+    def shutdown_executor(self):
+        """Stop the worker pool, dropping any jobs that have not started"""
+        executor = getattr(self, "executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
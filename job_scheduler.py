@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from probe_cache import probe_files
+
+
+def threads_per_job(job_count, cpu_count=None):
+    """Split the cores between concurrent ffmpeg processes so they do not oversubscribe"""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, job_count))
+
+
+class JobScheduler:
+    """Run a batch of ffmpeg jobs a few at a time and report back to a Tk window
+
+    Each job is a path plus run_job(path, threads) -> result. Durations are
+    read first (through the shared probe cache) and the longest files start
+    first, so one long file does not end up running alone at the end of the
+    batch. ffmpeg does the work in its own process, so worker threads only
+    wait on it.
+    Callbacks always run on the Tk thread:
+        on_result(path, result, error) after every job
+        on_finish() once the batch is done
+    """
+
+    def __init__(self, root, run_job, on_result, on_finish, max_jobs=None, ffmpeg_path=None):
+        self.root = root
+        self.run_job = run_job
+        self.on_result = on_result
+        self.on_finish = on_finish
+        self.max_jobs = max_jobs or os.cpu_count() or 1
+        self.ffmpeg_path = ffmpeg_path
+        self.executor = None
+        self.paths = []
+        self.durations = {}
+        self.probing = None
+        self.pending = {}
+        self.threads = 1
+        self.total = 0
+        self.done = 0
+
+    def start(self, paths):
+        """Probe the durations of paths and then convert them"""
+        self.paths = list(paths)
+        self.total = len(paths)
+        self.done = 0
+        job_count = max(1, min(self.max_jobs, self.total))
+        self.threads = threads_per_job(job_count)
+        self.executor = ThreadPoolExecutor(max_workers=job_count)
+        self.probing = self.executor.submit(probe_files, paths, self.ffmpeg_path)
+        self.pending = {}
+        self.root.after(100, self.poll)
+
+    def schedule(self):
+        """Submit the jobs longest-first once every duration is known"""
+        try:
+            infos = self.probing.result()
+        except Exception:
+            infos = {}
+        durations = {path: (infos.get(path) or {}).get("duration") for path in self.paths}
+        self.durations = durations
+        self.probing = None
+
+        def job_length(path):
+            # Unknown durations fall back to file size, after every probed file
+            duration = durations[path]
+            if duration is not None:
+                return (1, duration)
+            try:
+                return (0, os.path.getsize(path))
+            except OSError:
+                return (0, 0)
+
+        for path in sorted(durations, key=job_length, reverse=True):
+            future = self.executor.submit(self.run_job, path, self.threads)
+            self.pending[future] = path
+
+    def running(self):
+        """Number of jobs currently converting"""
+        return sum(1 for future in self.pending if future.running())
+
+    def poll(self):
+        """Hand finished jobs to the window and keep polling until the batch is done"""
+        try:
+            if not self.root.winfo_exists():
+                self.cancel()
+                return
+        except Exception:
+            # Window was closed while converting
+            self.cancel()
+            return
+
+        if self.probing is not None:
+            if self.probing.done():
+                self.schedule()
+            self.root.after(100, self.poll)
+            return
+
+        for future in [f for f in self.pending if f.done()]:
+            path = self.pending.pop(future)
+            self.done += 1
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            self.on_result(path, result, error)
+
+        if self.pending:
+            self.root.after(100, self.poll)
+            return
+
+        self.cancel()
+        self.on_finish()
+
+    def cancel(self):
+        """Stop the batch, dropping any jobs that have not started"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -1,4 +1,5 @@
 import tkinter as tk
+import multiprocessing
 import os
 import sys
 from tkinter import ttk
@@ -97,6 +98,8 @@ class MainApp:
         )
 
 if __name__ == "__main__":
+    # Required for the image converter's process pool in PyInstaller builds
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = MainApp(root)
     root.mainloop()
\ No newline at end of file
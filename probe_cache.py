@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from conversion_cache import default_cache_dir
+from ffmpeg_tools import probe_media
+
+# Bump when probe_media output changes so old entries are probed again
+PROBE_CACHE_VERSION = 1
+
+# ffprobe mostly waits on disk or network, so probe more files than there are cores
+PROBE_WORKERS = 8
+
+
+def probe_parallel(paths, ffmpeg_path=None, max_workers=PROBE_WORKERS):
+    """Probe files on a thread pool; returns a list of infos, None where probing failed"""
+    def probe_or_none(path):
+        try:
+            return probe_media(path, ffmpeg_path=ffmpeg_path)
+        except Exception:
+            return None
+
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as executor:
+        return list(executor.map(probe_or_none, paths))
+
+
+class ProbeCache:
+    """SQLite cache of probe_media results keyed by path, size and mtime
+
+    A file is probed again only when its size or mtime changes, so reopening
+    a large library (or one on a network share) costs one stat per file.
+    The connection belongs to the thread that created the cache; use
+    probe_file/probe_files from worker threads.
+    """
+
+    def __init__(self, cache_dir=None, ffmpeg_path=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.ffmpeg_path = ffmpeg_path
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(self.cache_dir, "probe.db"), timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, version INTEGER, info TEXT)"
+            )
+
+    def close(self):
+        """Close the cache database"""
+        self.db.close()
+
+    def lookup(self, path, stat):
+        """Get the cached probe result of path, or None if it is missing or stale"""
+        row = self.db.execute(
+            "SELECT info FROM probes WHERE path = ? AND size = ? AND mtime_ns = ? AND version = ?",
+            (path, stat.st_size, stat.st_mtime_ns, PROBE_CACHE_VERSION)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def remember(self, entries):
+        """Store (path, stat, info) tuples in one transaction"""
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?)",
+                [
+                    (path, stat.st_size, stat.st_mtime_ns, PROBE_CACHE_VERSION, json.dumps(info))
+                    for path, stat, info in entries
+                ]
+            )
+
+    def probe(self, path):
+        """Probe one file, reusing the cached result while it is unchanged
+
+        Raises FFmpegError or OSError when the file cannot be read.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        info = self.lookup(path, stat)
+        if info is None:
+            info = probe_media(path, ffmpeg_path=self.ffmpeg_path)
+            self.remember([(path, stat, info)])
+        return info
+
+    def probe_many(self, paths, max_workers=PROBE_WORKERS):
+        """Probe a whole selection, running the uncached files in parallel
+
+        Returns {path: info}, with None for files that could not be read.
+        """
+        results = {}
+        missing = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                results[path] = None
+                continue
+            info = self.lookup(os.path.abspath(path), stat)
+            results[path] = info
+            if info is None:
+                missing.append((path, stat))
+
+        if not missing:
+            return results
+
+        infos = probe_parallel([path for path, stat in missing], self.ffmpeg_path, max_workers)
+        found = []
+        for (path, stat), info in zip(missing, infos):
+            results[path] = info
+            if info is not None:
+                found.append((os.path.abspath(path), stat, info))
+        self.remember(found)
+        return results
+
+
+def open_probe_cache(ffmpeg_path=None):
+    """Open the shared probe cache, or None if its folder is not writable"""
+    try:
+        return ProbeCache(ffmpeg_path=ffmpeg_path)
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def probe_file(path, ffmpeg_path=None):
+    """Probe one file through the shared cache (safe to call from any thread)"""
+    cache = open_probe_cache(ffmpeg_path)
+    if cache is None:
+        return probe_media(path, ffmpeg_path=ffmpeg_path)
+    try:
+        return cache.probe(path)
+    finally:
+        cache.close()
+
+
+def probe_files(paths, ffmpeg_path=None):
+    """Probe a selection of files in parallel through the shared cache
+
+    Returns {path: info}, with None for files that could not be read.
+    """
+    cache = open_probe_cache(ffmpeg_path)
+    if cache is None:
+        return dict(zip(paths, probe_parallel(list(paths), ffmpeg_path)))
+    try:
+        return cache.probe_many(paths)
+    finally:
+        cache.close()
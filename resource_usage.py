@@ -0,0 +1,94 @@
+import os
+import sys
+
+
+def peak_rss_bytes():
+    """Return the peak resident memory of the current process in bytes
+
+    Returns None when the platform does not expose the value.
+    """
+    if os.name == "nt":
+        return _windows_peak_rss()
+
+    # VmHWM belongs to this process image, while ru_maxrss can include the
+    # memory of the parent we were forked from
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def children_peak_rss_bytes():
+    """Return the peak resident memory of the largest finished child process (e.g. ffmpeg)
+
+    Returns None on Windows, which does not track it.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+
+def children_cpu_seconds():
+    """Return the user + system CPU time of finished child processes (e.g. ffmpeg) in seconds
+
+    Windows does not track it and reports 0.
+    """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def _windows_peak_rss():
+    """Read PeakWorkingSetSize through the Windows process status API"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
+
+def format_megabytes(size):
+    """Format a byte count as whole megabytes for status messages"""
+    if size is None:
+        return "n/a"
+    return f"{size / (1024 * 1024):.0f} MB"
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from audio_processing import Downmix, FadeIn, FadeOut, Gain, Normalize, db_to_scale, process_chunks
+
+RATE = 1000
+
+
+def ones(frames, channels=2):
+    return np.ones((frames, channels), dtype=np.float32)
+
+
+def run(samples, operations, chunk_frames):
+    """Process samples in chunks of chunk_frames and join the written output"""
+    chunks = (
+        (samples[start:start + chunk_frames].copy(), start) for start in range(0, len(samples), chunk_frames)
+    )
+    written = []
+    process_chunks(chunks, operations, RATE, lambda chunk: written.append(chunk.copy()))
+    return np.concatenate(written)
+
+
+def test_gain_scales_samples():
+    result = run(ones(10), [Gain(-6)], 4)
+    assert np.allclose(result, db_to_scale(-6))
+
+
+def test_normalize_scales_peak_to_target():
+    samples = ones(10) * np.float32(0.25)
+    normalize = Normalize(-1.0)
+    normalize.set_peak(0.25)
+    result = run(samples, [normalize], 4)
+    assert np.abs(result).max() == pytest.approx(db_to_scale(-1.0), rel=1e-6)
+
+
+def test_normalize_leaves_silence_alone():
+    normalize = Normalize()
+    normalize.set_peak(0)
+    assert np.array_equal(run(np.zeros((5, 2), dtype=np.float32), [normalize], 4), np.zeros((5, 2)))
+
+
+@pytest.mark.parametrize("chunk_frames", [3, 7, 100])
+def test_fades_match_across_chunk_boundaries(chunk_frames):
+    # 20 ms at 1 kHz is 20 frames of ramp at each end
+    result = run(ones(50), [FadeIn(20), FadeOut(20)], chunk_frames)
+    expected = np.ones(50, dtype=np.float32)
+    expected[:20] = np.arange(20) / 20
+    expected[30:] = np.arange(20, 0, -1) / 20
+    assert result.shape == (50, 2)
+    assert np.allclose(result[:, 0], expected)
+    assert np.allclose(result[:, 1], expected)
+
+
+def test_fade_out_longer_than_recording_covers_it_all():
+    result = run(ones(5), [FadeOut(20)], 2)
+    assert np.allclose(result[:, 0], np.arange(5, 0, -1) / 5)
+
+
+def test_downmix_averages_channels():
+    samples = np.array([[1, 0, 0.5], [0.2, 0.4, 0.6]] * 3, dtype=np.float32)
+    result = run(samples, [Downmix()], 4)
+    assert result.shape == (6, 1)
+    assert np.allclose(result[:, 0], samples.mean(axis=1))
+    assert Downmix().output_channels(6) == 1
+
+
+def test_downmix_keeps_mono():
+    samples = np.arange(4, dtype=np.float32).reshape(4, 1)
+    assert np.array_equal(run(samples, [Downmix()], 3), samples)
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from batch_journal import BatchJournal, atomic_outputs, temp_output_path, unique_output_name
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("FILE_CONVERTER_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def write(path, data=b"data"):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_resume_skips_done_files(tmp_path):
+    inputs = [str(tmp_path / name) for name in ("a.wav", "b.wav", "c.wav")]
+    journal = BatchJournal.create("audio", {"target_formats": ["mp3"]}, inputs)
+    journal.mark_done(inputs[0], [write(tmp_path / "a.mp3")])
+    journal.mark_failed(inputs[1], RuntimeError("broken"))
+
+    resumed = BatchJournal.latest("audio")
+    assert resumed.inputs == inputs
+    assert resumed.settings == {"target_formats": ["mp3"]}
+    assert [resumed.is_complete(input_path) for input_path in inputs] == [True, False, False]
+    assert resumed.completed_count() == 1
+
+
+def test_changed_or_missing_output_is_converted_again(tmp_path):
+    inputs = [str(tmp_path / "a.wav"), str(tmp_path / "b.wav")]
+    journal = BatchJournal.create("audio", {}, inputs)
+    journal.mark_done(inputs[0], [write(tmp_path / "a.mp3")])
+    journal.mark_done(inputs[1], [write(tmp_path / "b.mp3")])
+    write(tmp_path / "a.mp3", b"overwritten since")
+    os.remove(tmp_path / "b.mp3")
+
+    resumed = BatchJournal.latest("audio")
+    assert not resumed.is_complete(inputs[0])
+    assert not resumed.is_complete(inputs[1])
+
+
+def test_line_cut_short_by_a_crash_is_ignored(tmp_path):
+    input_path = str(tmp_path / "a.wav")
+    journal = BatchJournal.create("video", {}, [input_path])
+    journal.mark_done(input_path, [write(tmp_path / "a.mp4")])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "done", "inp')
+
+    assert BatchJournal.load(journal.path).is_complete(input_path)
+
+
+def test_finished_batch_leaves_nothing_to_resume(tmp_path):
+    journal = BatchJournal.create("image", {}, [str(tmp_path / "a.png")])
+    journal.finish()
+    assert BatchJournal.latest("image") is None
+
+
+def test_new_batch_replaces_older_journal(tmp_path):
+    BatchJournal.create("audio", {}, [str(tmp_path / "old.wav")])
+    BatchJournal.create("audio", {}, [str(tmp_path / "new.wav")])
+    assert BatchJournal.latest("audio").inputs == [str(tmp_path / "new.wav")]
+
+
+def test_temp_names_are_unique_and_keep_the_extension(tmp_path):
+    output_file = str(tmp_path / "song.mp3")
+    first, second = temp_output_path(output_file), temp_output_path(output_file)
+    assert first != second
+    assert first.endswith(".mp3") and second.endswith(".mp3")
+
+
+def test_atomic_outputs_renames_on_success_and_cleans_up_on_error(tmp_path):
+    done, failed = str(tmp_path / "done.mp3"), str(tmp_path / "failed.mp3")
+    with atomic_outputs([done]) as temps:
+        write(tmp_path / os.path.basename(temps[0]), b"complete")
+    with pytest.raises(RuntimeError):
+        with atomic_outputs([failed]) as temps:
+            write(tmp_path / os.path.basename(temps[0]), b"half")
+            raise RuntimeError("encoder crashed")
+
+    assert os.listdir(tmp_path) == ["done.mp3"]
+    assert (tmp_path / "done.mp3").read_bytes() == b"complete"
+
+
+def test_same_names_are_numbered():
+    taken = set()
+    names = [unique_output_name(name, taken) for name in ("song", "Song", "song", "other")]
+    assert names == ["song", "Song (2)", "song (3)", "other"]
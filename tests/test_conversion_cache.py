@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from conversion_cache import ConversionCache, open_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_store_then_fetch_is_a_hit(tmp_path, cache):
+    source = write(tmp_path / "in.wav", b"audio")
+    key = cache.make_key(source, "mp3", {"bitrate": "192k"})
+    cache.store(key, write(tmp_path / "out.mp3", b"converted"))
+
+    placed = tmp_path / "again.mp3"
+    assert cache.fetch(key, str(placed))
+    assert placed.read_bytes() == b"converted"
+
+
+def test_other_content_or_options_miss(tmp_path, cache):
+    source = write(tmp_path / "in.wav", b"audio")
+    key = cache.make_key(source, "mp3", {"bitrate": "192k"})
+    cache.store(key, write(tmp_path / "out.mp3", b"converted"))
+
+    assert cache.make_key(source, "mp3", {"bitrate": "320k"}) != key
+    assert cache.make_key(source, "ogg", {"bitrate": "192k"}) != key
+    other = write(tmp_path / "other.wav", b"other audio")
+    assert not cache.fetch(cache.make_key(other, "mp3", {"bitrate": "192k"}), str(tmp_path / "x.mp3"))
+
+
+def test_changed_input_gets_a_new_key(tmp_path, cache):
+    source = tmp_path / "in.wav"
+    write(source, b"audio")
+    key = cache.make_key(str(source), "mp3")
+    write(source, b"edited audio")
+    assert cache.make_key(str(source), "mp3") != key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Room for three 100 byte entries
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=350)
+    keys = []
+    for name in ("a", "b", "c"):
+        key = cache.make_key(write(tmp_path / f"{name}.wav", name.encode()), "mp3")
+        cache.store(key, write(tmp_path / f"{name}.mp3", b"x" * 100))
+        keys.append(key)
+        time.sleep(0.01)
+
+    # "a" was stored first but used last, so "b" is the one to go
+    assert cache.fetch(keys[0], str(tmp_path / "a-again.mp3"))
+    time.sleep(0.01)
+    key = cache.make_key(write(tmp_path / "d.wav", b"d"), "mp3")
+    cache.store(key, write(tmp_path / "d.mp3", b"x" * 100))
+
+    assert cache.fetch(keys[0], str(tmp_path / "a-3.mp3"))
+    assert not cache.fetch(keys[1], str(tmp_path / "b-2.mp3"))
+    assert cache.fetch(key, str(tmp_path / "d-2.mp3"))
+    cache.close()
+
+
+def test_open_cache_without_a_usable_folder_returns_none(tmp_path):
+    blocker = tmp_path / "not-a-folder"
+    blocker.write_bytes(b"")
+    assert open_cache(str(blocker)) is None
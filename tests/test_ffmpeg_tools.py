@@ -0,0 +1,67 @@
+import subprocess
+
+import pytest
+
+import ffmpeg_tools
+from ffmpeg_tools import FFmpegError, fan_out_audio, layout_channels, output_threads, probe_with_ffmpeg
+
+HEADER = """Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'in.m4a':
+  Duration: 00:01:02.50, start: 0.000000, bitrate: 200 kb/s
+  Stream #0:0[0x1](und): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, {layout}, fltp, 192 kb/s (default)
+At least one output file must be specified
+"""
+
+
+def probe_layout(monkeypatch, layout):
+    def run(args, **kwargs):
+        return subprocess.CompletedProcess(args, 1, "", HEADER.format(layout=layout))
+
+    monkeypatch.setattr(subprocess, "run", run)
+    return probe_with_ffmpeg("in.m4a", "ffmpeg")
+
+
+@pytest.mark.parametrize("layout, channels", [("mono", 1), ("stereo", 2), ("5.1", 6), ("5.1(side)", 6)])
+def test_probe_reads_channel_count(monkeypatch, layout, channels):
+    info = probe_layout(monkeypatch, layout)
+    assert info["duration"] == pytest.approx(62.5)
+    assert info["streams"] == [{"type": "audio", "codec": "aac", "sample_rate": 48000, "channels": channels}]
+
+
+def test_unknown_layout_has_no_channel_count(monkeypatch):
+    assert probe_layout(monkeypatch, "unknown")["streams"][0]["channels"] is None
+
+
+@pytest.mark.parametrize("layout, channels", [
+    ("7.1", 8), ("quad", 4), ("quad(side)", 4), ("2.1", 3), ("7.1.4", 12), ("3 channels", 3),
+    ("12 channels (FL+FR)", 12),
+])
+def test_layout_channels(layout, channels):
+    assert layout_channels(layout) == channels
+
+
+def test_probe_without_streams_raises(monkeypatch):
+    def run(args, **kwargs):
+        return subprocess.CompletedProcess(args, 1, "", "in.m4a: Invalid data found when processing input\n")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    with pytest.raises(FFmpegError, match="Invalid data"):
+        probe_with_ffmpeg("in.m4a", "ffmpeg")
+
+
+def test_output_threads_are_shared_by_the_encoders():
+    assert output_threads(8, 2) == ["-threads", "4"]
+    assert output_threads(4, 3) == ["-threads", "1"]
+    assert output_threads(2, 5) == ["-threads", "1"]
+    assert output_threads(None, 2) == []
+
+
+def test_fan_out_shares_threads_among_encoded_outputs(monkeypatch):
+    commands = []
+    monkeypatch.setattr(ffmpeg_tools, "run_ffmpeg", lambda args, ffmpeg_path=None: commands.append(args))
+    outputs = [("mp3", "out.mp3"), ("flac", "out.flac"), ("m4a", "out.m4a")]
+    fan_out_audio("in.m4a", outputs, copy_formats={"m4a"}, threads=4)
+
+    args = commands[0]
+    assert args[:4] == ["-threads", "4", "-i", "in.m4a"]
+    assert args.count("-threads") == 3  # The decoder, and one per encoder but not for the copy
+    assert [args[i + 1] for i, arg in enumerate(args) if arg == "-threads"][1:] == ["2", "2"]
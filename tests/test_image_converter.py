@@ -0,0 +1,84 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image_converter import MemoryBudgetError, convert_image_file, frame_bytes
+
+
+def write_jpeg(path, size):
+    rng = np.random.default_rng(0)
+    coarse = Image.fromarray(rng.integers(0, 256, (size[1] // 64, size[0] // 64, 3), dtype=np.uint8))
+    coarse.resize(size, Image.BILINEAR).save(path, quality=90)
+
+
+def test_jpeg_over_memory_budget_is_drafted_down(tmp_path):
+    source = tmp_path / "large.jpg"
+    write_jpeg(source, (4000, 3000))
+    with Image.open(source) as img:
+        budget = frame_bytes(img) // 3  # 1/2 scale decodes 1/4 of the frame, so it fits
+
+    output = tmp_path / "large.png"
+    result = convert_image_file(str(source), str(output), "png", memory_budget=budget)
+
+    with Image.open(output) as converted:
+        assert frame_bytes(converted) <= budget
+        assert converted.width >= 1000
+    assert "memory budget" in result["note"]
+
+
+def test_jpeg_too_big_even_at_one_eighth_is_refused(tmp_path):
+    source = tmp_path / "large.jpg"
+    write_jpeg(source, (4000, 3000))
+    with Image.open(source) as img:
+        budget = frame_bytes(img) // 100  # Below the 1/8 scale frame (1/64 of the pixels)
+
+    with pytest.raises(MemoryBudgetError):
+        convert_image_file(str(source), str(tmp_path / "large.png"), "png", memory_budget=budget)
+
+
+@pytest.mark.parametrize("mode, target", [("P", "ico"), ("P", "jpg"), ("1", "png"), ("I;16", "png")])
+def test_max_size_shrinks_modes_reduce_cannot_average(tmp_path, mode, target):
+    rng = np.random.default_rng(0)
+    pixels = Image.fromarray(rng.integers(0, 256, (800, 1000, 3), dtype=np.uint8))
+    if mode == "P":
+        source = pixels.quantize(64)
+    elif mode == "1":
+        source = pixels.convert("1")
+    else:
+        source = Image.fromarray(np.asarray(pixels.convert("L"), dtype=np.uint16) * 257)
+    source_path = tmp_path / f"source-{mode.replace(';', '')}.{'png' if mode != '1' else 'bmp'}"
+    source.save(source_path)
+
+    output = tmp_path / f"small.{target}"
+    convert_image_file(str(source_path), str(output), target, max_dimension=64)
+
+    with Image.open(output) as converted:
+        # ICO stores its standard sizes up to the image size, and opens at the largest (48)
+        assert max(converted.size) == (48 if target == "ico" else 64)
+
+
+def convert_in_fresh_process(*args, **kwargs):
+    # A new interpreter starts from a low high-water mark, like a worker of the pool
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(convert_image_file, *args, **kwargs).result()
+
+
+@pytest.mark.parametrize("budget_mb, min_width", [(16, 2000), (40, 3400)])
+def test_bmp_over_memory_budget_stays_within_it(tmp_path, budget_mb, min_width):
+    # 4000x3000 RGB takes 48 MB decoded, so it has to be resampled strip by strip
+    rng = np.random.default_rng(0)
+    source = tmp_path / "large.bmp"
+    Image.fromarray(rng.integers(0, 256, (3000, 4000, 3), dtype=np.uint8)).save(source)
+
+    budget = budget_mb * 1024 * 1024
+    output = tmp_path / "large.png"
+    result = convert_in_fresh_process(str(source), str(output), "png", memory_budget=budget)
+
+    assert result["memory_used"] <= budget
+    with Image.open(output) as converted:
+        assert converted.width >= min_width
+    assert "memory budget" in result["note"]
@@ -0,0 +1,48 @@
+import os
+import threading
+
+from PIL import Image
+
+from thumbnails import ThumbnailLoader, prune_thumbnail_cache
+
+
+class FakeRoot:
+    def after(self, delay, callback):
+        pass
+
+
+def test_rebound_owner_cancels_a_decode_nobody_wants(tmp_path):
+    paths = []
+    for name in ("a.png", "b.png", "c.png"):
+        Image.new("RGB", (64, 64)).save(tmp_path / name)
+        paths.append(str(tmp_path / name))
+
+    loader = ThumbnailLoader(FakeRoot(), cache_dir=str(tmp_path / "thumbs"), workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    loader.executor.submit(lambda: (started.set(), release.wait()))
+    started.wait()  # The only worker is busy, so the requests below stay queued
+
+    loader.request(paths[0], lambda path, photo: None, owner="row 1")
+    loader.request(paths[0], lambda path, photo: None, owner="row 2")
+    first = loader.futures[paths[0]]
+    loader.request(paths[1], lambda path, photo: None, owner="row 1")
+    assert not first.cancelled()  # Row 2 still shows the first file
+
+    loader.request(paths[2], lambda path, photo: None, owner="row 2")
+    assert first.cancelled()
+    assert set(loader.futures) == {paths[1], paths[2]}
+    assert loader.owners == {"row 1": paths[1], "row 2": paths[2]}
+
+    release.set()
+    loader.close()
+
+
+def test_prune_removes_least_recently_used_thumbnails(tmp_path):
+    for age, name in enumerate(["new.png", "middle.png", "old.png"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    prune_thumbnail_cache(str(tmp_path), max_bytes=250)
+    assert sorted(os.listdir(tmp_path)) == ["middle.png", "new.png"]
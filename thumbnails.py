@@ -0,0 +1,212 @@
+import hashlib
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageTk
+from codec_registry import ensure_codecs_for
+from conversion_cache import default_cache_dir
+
+THUMBNAIL_SIZE = (48, 48)
+
+# Size limit of the thumbnail folder on disk (64 MB), and how many decodes
+# are started between two checks of it
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PRUNE_EVERY = 256
+
+
+def thumbnail_cache_dir():
+    """Get the folder used for cached thumbnails"""
+    return os.path.join(default_cache_dir(), "thumbnails")
+
+
+def cache_key(path, size):
+    """Key a thumbnail by file path, mtime and thumbnail size"""
+    stat = os.stat(path)
+    text = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def load_thumbnail(path, size=THUMBNAIL_SIZE, cache_dir=None):
+    """Build (or read back from disk) a small thumbnail of an image file
+
+    Runs on a background thread. JPEG files are decoded in draft mode, so
+    only a fraction of the pixels is produced. Returns a loaded PIL image.
+    """
+    cached = None
+    if cache_dir:
+        cached = os.path.join(cache_dir, cache_key(path, size) + ".png")
+        if os.path.isfile(cached):
+            try:
+                with Image.open(cached) as thumb:
+                    thumb.load()
+                os.utime(cached)  # Mark as recently used for prune_thumbnail_cache
+                return thumb
+            except OSError:
+                pass  # Unreadable cache file, build it again
+
+    ensure_codecs_for(path)
+    with Image.open(path) as img:
+        img.draft("RGB", size)
+        img.thumbnail(size)
+        thumb = img.convert("RGBA")
+
+    if cached:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp = cached + ".tmp"
+            thumb.save(temp, "PNG")
+            os.replace(temp, cached)
+        except OSError:
+            pass  # The disk cache is only an optimization
+
+    return thumb
+
+
+def prune_thumbnail_cache(cache_dir, max_bytes=THUMBNAIL_CACHE_MAX_BYTES):
+    """Remove least recently used thumbnails until the folder fits in max_bytes"""
+    try:
+        entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".png")]
+        files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+    except OSError:
+        return  # Missing or unreadable folder, nothing to prune
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+class ThumbnailLoader:
+    """Decode thumbnails off the Tk thread and hand them back as PhotoImages
+
+    Finished thumbnails are kept in a bounded in-memory LRU, backed by a
+    size-limited on-disk cache keyed by path and mtime. Callbacks always run
+    on the Tk thread, because PhotoImage objects may only be created there.
+
+    Each request may name an owner (such as a pooled list row). A new request
+    from the same owner replaces its old one, and a decode that no owner
+    wants anymore is cancelled if it has not started, so fast scrolling does
+    not leave a queue of thumbnails for rows that are long gone.
+    """
+
+    def __init__(self, root, size=THUMBNAIL_SIZE, max_items=256, cache_dir=None, workers=2):
+        self.root = root
+        self.size = size
+        self.max_items = max_items
+        self.cache_dir = cache_dir if cache_dir is not None else thumbnail_cache_dir()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.memory = OrderedDict()
+        self.waiting = {}  # path -> {owner: callback}
+        self.futures = {}  # path -> decode in progress
+        self.owners = {}  # owner -> path it waits for
+        self.results = queue.Queue()
+        self.polling = False
+        self.decodes = 0
+        self.executor.submit(prune_thumbnail_cache, self.cache_dir)
+
+    def get(self, path):
+        """Get a ready thumbnail from memory, or None"""
+        photo = self.memory.get(path)
+        if photo is not None:
+            self.memory.move_to_end(path)
+        return photo
+
+    def request(self, path, callback, owner=None):
+        """Call callback(path, photo) once the thumbnail of path is ready
+
+        photo is None when the file could not be decoded. A request replaces
+        the earlier one of the same owner.
+        """
+        if owner is None:
+            owner = object()
+        else:
+            self.release(owner)
+
+        photo = self.get(path)
+        if photo is not None:
+            callback(path, photo)
+            return
+
+        # Several rows may ask for the same file while it is being decoded
+        self.waiting.setdefault(path, {})[owner] = callback
+        self.owners[owner] = path
+        if path in self.futures:
+            return
+
+        future = self.executor.submit(load_thumbnail, path, self.size, self.cache_dir)
+        future.add_done_callback(lambda f, p=path: self.results.put((p, f)))
+        self.futures[path] = future
+        self.decodes += 1
+        if self.decodes % PRUNE_EVERY == 0:
+            self.executor.submit(prune_thumbnail_cache, self.cache_dir)
+        self.start_polling()
+
+    def release(self, owner):
+        """Drop the pending request of owner, cancelling a decode nobody else wants"""
+        path = self.owners.pop(owner, None)
+        if path is None:
+            return
+
+        callbacks = self.waiting.get(path, {})
+        callbacks.pop(owner, None)
+        if not callbacks:
+            self.waiting.pop(path, None)
+            future = self.futures.pop(path, None)
+            if future is not None:
+                future.cancel()  # No effect once the decode has started
+
+    def start_polling(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(50, self.poll)
+
+    def poll(self):
+        """Deliver finished thumbnails on the Tk thread"""
+        while True:
+            try:
+                path, future = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if future.cancelled():
+                continue
+
+            try:
+                photo = ImageTk.PhotoImage(future.result())
+                self.remember(path, photo)
+            except Exception:
+                photo = None
+
+            # A decode that was released while running still fills the LRU,
+            # but its path may have been requested again since
+            if self.futures.get(path) is not future:
+                continue
+            del self.futures[path]
+            for owner, callback in self.waiting.pop(path, {}).items():
+                self.owners.pop(owner, None)
+                try:
+                    callback(path, photo)
+                except Exception:
+                    pass  # Row was destroyed before its thumbnail arrived
+
+        if self.futures:
+            self.root.after(50, self.poll)
+        else:
+            self.polling = False
+
+    def remember(self, path, photo):
+        """Add a thumbnail to the in-memory LRU"""
+        self.memory[path] = photo
+        self.memory.move_to_end(path)
+        while len(self.memory) > self.max_items:
+            self.memory.popitem(last=False)
+
+    def close(self):
+        """Stop decoding thumbnails that have not started yet"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -3,30 +3,268 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import sys
 import re
-import subprocess
 from pydub import AudioSegment
-from pydub.utils import which
+from audio_converter import convert_audio_outputs
+from audio_video import BACKGROUNDS, DEFAULT_BACKGROUND, convert_audio_to_video, is_audio_only
+from batch_journal import (
+    BatchJournal, atomic_output, atomic_outputs, file_signature, open_journal, unique_output_name
+)
+from conversion_cache import open_cache, store_in_cache
+from file_list import VirtualFileList
+from ffmpeg_tools import (
+    AUDIO_FORMATS, AUDIO_OUTPUT_ARGS, FFmpegError, find_ffmpeg, output_threads, remux_maps, run_ffmpeg,
+    video_stream_index
+)
+from job_scheduler import JobScheduler
+from probe_cache import probe_file, probe_files
+from video_segments import SEGMENT_MIN_DURATION, encode_segmented
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Video containers offered as targets (display name, extension)
+VIDEO_TARGET_FORMATS = [
+    ("MP4", "mp4"),
+    ("AVI", "avi"),
+    ("MOV", "mov"),
+    ("MKV", "mkv"),
+    ("FLV", "flv"),
+    ("WMV", "wmv"),
+    ("WEBM", "webm"),
+    ("MPEG", "mpeg"),
+    ("MPG", "mpg")
+]
+
+# Source type for recordings that are rendered as video over a still picture
+AUDIO_SOURCE = "AUDIO (Audio to Video)"
+
+# Encoder used for each target container: ffmpeg's default, except MPEG-2
+# instead of MPEG-1 for .mpeg/.mpg
+VIDEO_ENCODERS = {
+    "mp4": "h264", "mov": "h264", "mkv": "h264", "webm": "vp9", "avi": "mpeg4",
+    "flv": "flv1", "wmv": "msmpeg4v3", "mpeg": "mpeg2video", "mpg": "mpeg2video",
+}
+
+# ffmpeg video options per preset and encoder (measured fps are in the README).
+# "Balanced" H.264 matches the settings used before presets existed. VP9 uses
+# row multithreading and tile columns so it is no longer single-threaded, and
+# the MPEG encoders get a quality or bitrate target instead of ffmpeg's 200 kbit/s.
+ENCODER_PRESETS = {
+    "Fastest": {
+        "h264": ["-c:v", "libx264", "-preset", "veryfast", "-crf", "23"],
+        "vp9": ["-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-row-mt", "1",
+                "-tile-columns", "2", "-crf", "36", "-b:v", "0"],
+        "mpeg4": ["-c:v", "mpeg4", "-q:v", "5"],
+        "flv1": ["-c:v", "flv", "-q:v", "5"],
+        "msmpeg4v3": ["-c:v", "msmpeg4", "-q:v", "5"],
+        "mpeg2video": ["-c:v", "mpeg2video", "-b:v", "8M", "-maxrate", "9M", "-bufsize", "1835k", "-bf", "0"],
+    },
+    "Balanced": {
+        "h264": ["-c:v", "libx264", "-preset", "medium", "-crf", "23"],
+        "vp9": ["-c:v", "libvpx-vp9", "-deadline", "good", "-cpu-used", "4", "-row-mt", "1",
+                "-tile-columns", "2", "-crf", "32", "-b:v", "0"],
+        "mpeg4": ["-c:v", "mpeg4", "-q:v", "4", "-bf", "2"],
+        "flv1": ["-c:v", "flv", "-q:v", "4"],
+        "msmpeg4v3": ["-c:v", "msmpeg4", "-q:v", "4"],
+        "mpeg2video": ["-c:v", "mpeg2video", "-b:v", "6M", "-maxrate", "9M", "-bufsize", "1835k", "-bf", "2"],
+    },
+    "Smallest": {
+        "h264": ["-c:v", "libx264", "-preset", "slow", "-crf", "23"],
+        "vp9": ["-c:v", "libvpx-vp9", "-deadline", "good", "-cpu-used", "2", "-row-mt", "1",
+                "-tile-columns", "2", "-crf", "32", "-b:v", "0"],
+        "mpeg4": ["-c:v", "mpeg4", "-q:v", "4", "-bf", "2", "-mbd", "rd"],
+        # No effort setting made FLV1 or MS-MPEG-4 output smaller, so these match "Balanced"
+        "flv1": ["-c:v", "flv", "-q:v", "4"],
+        "msmpeg4v3": ["-c:v", "msmpeg4", "-q:v", "4"],
+        "mpeg2video": ["-c:v", "mpeg2video", "-b:v", "4M", "-maxrate", "9M", "-bufsize", "1835k", "-bf", "2",
+                       "-mbd", "rd"],
+    },
+}
+
+DEFAULT_PRESET = "Balanced"
+
+# Preset for videos rendered from a still picture: after the first frame
+# nothing moves, so slower presets only add encode time (see the README)
+STILL_PRESET = "Fastest"
+
+# Output heights offered for a rendition ladder; None keeps the source size
+RENDITION_HEIGHTS = [None, 1080, 720, 480]
+
+
+def video_job_count():
+    """How many videos a batch converts at once
+
+    Video encoders use several threads well, so fewer jobs run with more threads each.
+    """
+    return max(1, (os.cpu_count() or 1) // 2)
+
+
+def get_encoder_args(target_format, preset=DEFAULT_PRESET):
+    """Get the ffmpeg video encoder options for a target container under an encoder preset"""
+    options = ENCODER_PRESETS.get(preset, ENCODER_PRESETS[DEFAULT_PRESET])
+    return list(options.get(VIDEO_ENCODERS.get(target_format), []))
+
+
+def convert_video_file(input_path, output_file, ffmpeg_path=None, threads=None, on_progress=None,
+                       allow_copy=True, preset=DEFAULT_PRESET, segment=False):
+    """Convert one video with ffmpeg's default codecs for the output container
+
+    When the video and audio codecs already fit the target container (say
+    H.264/AAC from MP4 to MKV) the streams are copied, so only the
+    container changes and the file is written at disk speed.
+    Otherwise the video is encoded with the preset's options for the container.
+    With segment, videos of at least SEGMENT_MIN_DURATION are split at
+    keyframes and encoded by threads single-threaded processes at once
+    (see video_segments).
+    The output is written under a temporary name and renamed once complete.
+    on_progress gets ffmpeg's progress while encoding (see run_ffmpeg).
+    Returns "remuxed", "segmented" or "converted".
+    """
+    target_format = os.path.splitext(output_file)[1][1:].lower()
+    info = None
+    if allow_copy or segment:
+        try:
+            info = probe_file(input_path, ffmpeg_path)
+        except Exception:
+            pass  # Let the conversion below report the real problem
+    maps = remux_maps(info, target_format) if allow_copy and info else None
+    
+    with atomic_output(output_file) as temp_file:
+        if maps:
+            try:
+                run_ffmpeg(["-i", input_path] + maps + ["-c", "copy", temp_file], ffmpeg_path, threads, on_progress)
+                return "remuxed"
+            except FFmpegError:
+                pass  # Some streams cannot be muxed as-is (e.g. odd timestamps); encode them instead
+        
+        encoder_args = get_encoder_args(target_format, preset)
+        workers = threads or os.cpu_count() or 1
+        index = video_stream_index(info) if info else None
+        if (segment and workers > 1 and encoder_args and index is not None
+                and (info["duration"] or 0) >= SEGMENT_MIN_DURATION):
+            encode_segmented(
+                input_path, temp_file, encoder_args, info["duration"], workers, f"0:v:{index}",
+                ffmpeg_path, on_progress
+            )
+            return "segmented"
+        
+        run_ffmpeg(["-i", input_path] + encoder_args + [temp_file], ffmpeg_path, threads, on_progress)
+    return "converted"
+
+
+def rendition_name(height):
+    return "Original" if height is None else f"{height}p"
+
+
+def convert_video_renditions(input_path, renditions, ffmpeg_path=None, threads=None, on_progress=None,
+                             allow_copy=True, preset=DEFAULT_PRESET, segment=False):
+    """Write several renditions of one video from a single decode
+
+    renditions is a list of (height, output_file), where height None keeps
+    the source size; sources are never scaled up. One ffmpeg process
+    demuxes and decodes the input once and a split filter hands the frames
+    to a scaler and encoder per rendition, each output in its own container.
+    Full-size renditions whose streams fit their container are stream
+    copied in the same pass. A single full-size rendition goes through
+    convert_video_file, so it can still be segmented.
+    Returns {output_file: "remuxed", "segmented" or "converted"}.
+    """
+    if len(renditions) == 1 and renditions[0][0] is None:
+        output_file = renditions[0][1]
+        return {output_file: convert_video_file(
+            input_path, output_file, ffmpeg_path, threads, on_progress, allow_copy, preset, segment
+        )}
+    
+    try:
+        info = probe_file(input_path, ffmpeg_path)
+    except Exception:
+        info = None  # Let ffmpeg report the real problem
+    index = video_stream_index(info) if info else None
+    
+    # Stream maps of the full-size renditions that are copied instead of encoded
+    copy_maps = []
+    for height, output_file in renditions:
+        target_format = os.path.splitext(output_file)[1][1:].lower()
+        copy_maps.append(remux_maps(info, target_format) if allow_copy and info and height is None else None)
+    
+    # The input is decoded once with all threads; the encoders run side by side and share them
+    encoder_threads = output_threads(threads, sum(1 for maps in copy_maps if not maps))
+    with atomic_outputs([output_file for height, output_file in renditions]) as temp_files:
+        methods = {}
+        heights = []
+        output_args = []
+        for (height, output_file), temp_file, maps in zip(renditions, temp_files, copy_maps):
+            if maps:
+                output_args += maps + ["-c", "copy", temp_file]
+                methods[output_file] = "remuxed"
+                continue
+            
+            target_format = os.path.splitext(output_file)[1][1:].lower()
+            label = f"scaled{len(heights)}" if height else f"split{len(heights)}"
+            heights.append(height)
+            output_args += encoder_threads + ["-map", f"[{label}]", "-map", "0:a:0?"]
+            output_args += get_encoder_args(target_format, preset) + [temp_file]
+            methods[output_file] = "converted"
+        
+        args = (["-threads", str(threads)] if threads else []) + ["-i", input_path]
+        if heights:
+            # One decoded stream, split into a branch per encoded rendition
+            filters = [f"[0:v:{index or 0}]split={len(heights)}" + "".join(f"[split{i}]" for i in range(len(heights)))]
+            for i, height in enumerate(heights):
+                if height:
+                    filters.append(f"[split{i}]scale=-2:'min({height},ih)'[scaled{i}]")
+            args += ["-filter_complex", ";".join(filters)]
+        run_ffmpeg(args + output_args, ffmpeg_path, on_progress=on_progress)
+    return methods
+
+
+def render_audio_renditions(input_path, info, renditions, background=DEFAULT_BACKGROUND, image_path=None,
+                            ffmpeg_path=None, threads=None, on_progress=None):
+    """Render a recording without video as renditions showing a still picture
+
+    renditions is a list of (height, output_file) as for
+    convert_video_renditions. The picture is a waveform or an image (see
+    audio_video) encoded at one frame per second with still-image tuning
+    and STILL_PRESET, so a podcast takes seconds instead of a full-rate encode.
+    Returns {output_file: "copied" or "converted"} by whether the audio
+    stream was copied.
+    """
+    with atomic_outputs([output_file for height, output_file in renditions]) as temp_files:
+        outputs = []
+        for (height, output_file), temp_file in zip(renditions, temp_files):
+            target_format = os.path.splitext(output_file)[1][1:].lower()
+            encoder = VIDEO_ENCODERS.get(target_format)
+            outputs.append((temp_file, height, encoder, get_encoder_args(target_format, STILL_PRESET)))
+        methods = convert_audio_to_video(
+            input_path, info, outputs, background, image_path, ffmpeg_path, threads, on_progress
+        )
+    return {output_file: methods[temp_file] for (height, output_file), temp_file in zip(renditions, temp_files)}
+
+
+def format_duration(seconds):
+    """Format seconds as m:ss or h:mm:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
 
 class VideoConverter:
     def __init__(self, root, main_root):
-        if getattr(sys, 'frozen', False):
-            bundle_dir = sys._MEIPASS
-        else:
-            bundle_dir = os.path.dirname(os.path.abspath(__file__))
-    
-        ffmpeg_path = os.path.join(bundle_dir, "ffmpeg.exe")
-        if os.path.isfile(ffmpeg_path):
-            AudioSegment.converter = ffmpeg_path
+        # Prefer the bundled ffmpeg.exe, then ffmpeg on the PATH
+        self.ffmpeg_path = find_ffmpeg()
+        if self.ffmpeg_path:
+            AudioSegment.converter = self.ffmpeg_path
 
         self.root = root
         self.main_root = main_root
         self.root.title("Video Converter")
-        self.root.geometry("700x650")
+        self.root.geometry("700x840")
         self.center_window()
         self.set_app_icon()
         
         # Verify FFmpeg installation
-        if not which("ffmpeg"):
+        if not self.ffmpeg_path:
             messagebox.showerror(
                 "FFmpeg Missing",
                 "FFmpeg is required for video conversion. Please install FFmpeg and add it to your PATH."
@@ -37,24 +275,22 @@ class VideoConverter:
         # Supported formats
         self.source_formats = [
             "MP4", "AVI", "MOV", "MKV", "FLV", "WMV", "WEBM", "MPEG", "MPG",
-            "AUDIO (Extract from Video)"  # Added audio extraction option
-        ]
-        self.target_formats = [
-            ("MP4", "mp4"),
-            ("AVI", "avi"),
-            ("MOV", "mov"),
-            ("MKV", "mkv"),
-            ("FLV", "flv"),
-            ("WMV", "wmv"),
-            ("WEBM", "webm"),
-            ("MPEG", "mpeg"),
-            ("MPG", "mpg")
+            AUDIO_SOURCE  # Recordings rendered as video
         ]
+        self.target_formats = list(VIDEO_TARGET_FORMATS)
         self.input_paths = []
         self.output_path = ""
-        self.MAX_FILES = 20
+        # Picture shown by videos rendered from recordings ("" uses the cover art)
+        self.image_path = ""
+        self.scheduler = None
+        self.journal = None
+        # Latest ffmpeg progress of each running file, written by the worker threads
+        self.progress = {}
+        # Reads stream metadata of new selections in the background
+        self.probe_executor = ThreadPoolExecutor(max_workers=1)
         
         self.create_widgets()
+        self.root.bind("<Destroy>", self.on_destroy)
     
     def center_window(self):
         self.root.update_idletasks()
@@ -129,19 +365,30 @@ class VideoConverter:
         self.source_combo.current(0)
         self.source_combo.pack(side=tk.LEFT, padx=5)
         
-        # Target format selection
-        ttk.Label(conversion_frame, text="Convert to:").pack(side=tk.LEFT, padx=(5, 0))
-        self.target_format_var = tk.StringVar()
-        target_names = [fmt[0] for fmt in self.target_formats]
-        self.target_combo = ttk.Combobox(
-            conversion_frame,
-            textvariable=self.target_format_var,
-            values=target_names,
-            state="readonly",
-            width=15
-        )
-        self.target_combo.current(1)
-        self.target_combo.pack(side=tk.LEFT, padx=5)
+        # Target formats and sizes; every checked combination is written from a single decode
+        targets_frame = ttk.Frame(format_frame)
+        targets_frame.pack(fill=tk.X, padx=10, pady=(0, 5))
+        ttk.Label(targets_frame, text="Convert to:").pack(side=tk.LEFT)
+        self.target_format_vars = {}
+        for display_name, extension in self.target_formats:
+            self.target_format_vars[extension] = tk.BooleanVar(value=extension == "avi")
+            ttk.Checkbutton(
+                targets_frame,
+                text=display_name,
+                variable=self.target_format_vars[extension]
+            ).pack(side=tk.LEFT, padx=(5, 0))
+        
+        sizes_frame = ttk.Frame(format_frame)
+        sizes_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(sizes_frame, text="Sizes:").pack(side=tk.LEFT)
+        self.height_vars = {}
+        for height in RENDITION_HEIGHTS:
+            self.height_vars[height] = tk.BooleanVar(value=height is None)
+            ttk.Checkbutton(
+                sizes_frame,
+                text=rendition_name(height),
+                variable=self.height_vars[height]
+            ).pack(side=tk.LEFT, padx=(5, 0))
         
         # Input section
         input_frame = ttk.LabelFrame(main_frame, text="STEP 2: SELECT FILES", style="Section.TFrame")
@@ -159,25 +406,13 @@ class VideoConverter:
         preview_frame = ttk.Frame(input_frame)
         preview_frame.pack(fill=tk.X, pady=(5, 10))
         
-        # Create container for preview with scrollable canvas
-        preview_container = ttk.Frame(preview_frame)
-        preview_container.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
-        # Create canvas with scrollbar
-        self.canvas = tk.Canvas(preview_container, bg="#f0f0f0", height=150)
-        scrollbar = ttk.Scrollbar(preview_container, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas, style="Preview.TFrame")
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Virtualized file list; only the visible rows have widgets
+        self.file_list = VirtualFileList(
+            preview_frame,
+            on_remove=self.remove_file,
+            placeholder="No files selected. Click 'Browse Files' to add files."
         )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.file_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Selected files label
         self.files_label = ttk.Label(
@@ -237,14 +472,94 @@ class VideoConverter:
         )
         self.folder_entry.pack(side=tk.LEFT, padx=5)
         
-        # Convert button
+        # Reuse results of earlier identical conversions
+        self.use_cache_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            folder_frame,
+            text="Reuse cached results",
+            variable=self.use_cache_var
+        ).pack(side=tk.RIGHT)
+        
+        # Encoder speed/size preset
+        preset_frame = ttk.Frame(output_frame)
+        preset_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(preset_frame, text="Encoder preset:").pack(side=tk.LEFT)
+        self.preset_var = tk.StringVar(value=DEFAULT_PRESET)
+        self.preset_combo = ttk.Combobox(
+            preset_frame,
+            textvariable=self.preset_var,
+            values=list(ENCODER_PRESETS),
+            state="readonly",
+            width=10
+        )
+        self.preset_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            preset_frame,
+            text="(used when the video has to be re-encoded)",
+            foreground="#555555"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Long videos are split at keyframes and encoded on several processes
+        self.segment_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            preset_frame,
+            text=f"Split videos over {SEGMENT_MIN_DURATION // 60} min across cores",
+            variable=self.segment_var
+        ).pack(side=tk.RIGHT)
+        
+        # Picture shown when a recording without video is rendered as video
+        background_frame = ttk.Frame(output_frame)
+        background_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+        ttk.Label(background_frame, text="Audio files show:").pack(side=tk.LEFT)
+        self.background_var = tk.StringVar(value=DEFAULT_BACKGROUND)
+        ttk.Combobox(
+            background_frame,
+            textvariable=self.background_var,
+            values=BACKGROUNDS,
+            state="readonly",
+            width=10
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(
+            background_frame,
+            text="Image...",
+            width=8,
+            command=self.choose_image
+        ).pack(side=tk.LEFT, padx=5)
+        self.image_var = tk.StringVar(value="Cover art")
+        ttk.Label(
+            background_frame,
+            textvariable=self.image_var,
+            foreground="#555555"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Convert and resume buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=20)
         self.convert_btn = ttk.Button(
-            main_frame,
+            button_frame,
             text="CONVERT",
             command=self.convert_files,
             state="disabled"
         )
-        self.convert_btn.pack(pady=20)
+        self.convert_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Continues the last batch that was interrupted, skipping finished files
+        self.resume_btn = ttk.Button(
+            button_frame,
+            text="RESUME",
+            command=self.resume_batch
+        )
+        self.resume_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Batch progress, measured in seconds of video encoded
+        self.progress_bar = ttk.Progressbar(main_frame, mode="determinate", maximum=100)
+        self.progress_bar.pack(fill=tk.X, pady=(0, 5))
+        self.progress_var = tk.StringVar()
+        ttk.Label(
+            main_frame,
+            textvariable=self.progress_var,
+            foreground="#555555"
+        ).pack(fill=tk.X)
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -257,6 +572,14 @@ class VideoConverter:
         )
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
     
+    def on_destroy(self, event):
+        """Stop queued conversions and metadata reads when the window is closed"""
+        if event.widget is not self.root:
+            return
+        self.probe_executor.shutdown(wait=False, cancel_futures=True)
+        if self.scheduler:
+            self.scheduler.cancel()
+    
     def navigate(self, converter_name):
         if converter_name == "Main Menu":
             self.root.destroy()
@@ -297,7 +620,7 @@ class VideoConverter:
             "WEBM": ("*.webm",),
             "MPEG": ("*.mpeg",),
             "MPG": ("*.mpg",),
-            "AUDIO (Extract from Video)": ("*.mp3 *.wav *.aac *.m4a *.ogg *.wma *.flac",)
+            AUDIO_SOURCE: ("*.mp3 *.wav *.aac *.m4a *.ogg *.wma *.flac",)
             
         }
         
@@ -316,8 +639,8 @@ class VideoConverter:
         valid_paths = []
         for path in file_paths:
             ext = os.path.splitext(path)[1].lower()
-            if source_type == "AUDIO (Extract from Video)":
-                # Allow all video formats for audio extraction
+            if source_type == AUDIO_SOURCE:
+                # Recordings; MPEG files may hold audio only
                 if ext in ['.mp3', '.wav', '.aac', '.m4a', '.ogg', '.wma', '.flac', '.mpeg', '.mpg']:
                     valid_paths.append(path)
             else:
@@ -333,16 +656,8 @@ class VideoConverter:
             )
             return
             
-        # Add new files to existing selection
-        new_paths = list(set(self.input_paths + valid_paths))
-        
-        # Limit to MAX_FILES
-        if len(new_paths) > self.MAX_FILES:
-            new_paths = new_paths[:self.MAX_FILES]
-            messagebox.showwarning(
-                "File Limit", 
-                f"Maximum {self.MAX_FILES} files allowed. Only first {self.MAX_FILES} will be processed."
-            )
+        # Add new files to existing selection, keeping the original order
+        new_paths = list(dict.fromkeys(self.input_paths + valid_paths))
         
         self.input_paths = new_paths
         self.process_files()
@@ -352,8 +667,8 @@ class VideoConverter:
             source_type = self.source_format_var.get()
             file_type = "video"
             
-            if source_type == "AUDIO (Extract from Video)":
-                file_type = "video (audio extraction)"
+            if source_type == AUDIO_SOURCE:
+                file_type = "audio"
             
             self.files_label.config(text=f"{len(self.input_paths)} {file_type} files selected")
             self.convert_btn.config(state="normal" if self.input_paths else "disabled")
@@ -361,79 +676,20 @@ class VideoConverter:
             
             # Show previews for all files
             self.show_previews()
+            self.warm_probe_cache()
             
         except Exception as e:
             messagebox.showerror("Error", f"Could not load files:\n{str(e)}")
             self.status_var.set(f"Error loading files: {str(e)}")
     
-    def clear_previews(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-    
     def show_previews(self):
-        try:
-            # Clear existing previews
-            self.clear_previews()
-            
-            # Only show if there are files
-            if not self.input_paths:
-                # Add placeholder text when no files
-                placeholder = ttk.Label(
-                    self.scrollable_frame,
-                    text="No files selected. Click 'Browse Files' to add files.",
-                    foreground="#888888",
-                    font=("Arial", 9)
-                )
-                placeholder.pack(pady=20)
-                return
-            
-            # Configure for file list
-            for i, file_path in enumerate(self.input_paths):
-                # Create file container
-                file_frame = ttk.Frame(
-                    self.scrollable_frame,
-                    padding=5,
-                    relief="groove",
-                    borderwidth=1
-                )
-                file_frame.pack(fill=tk.X, padx=5, pady=2)
-                file_frame.file_path = file_path  # Store file path in frame
-                
-                # Filename with remove button
-                filename = os.path.basename(file_path)
-                
-                # Filename and remove button container
-                bottom_frame = ttk.Frame(file_frame)
-                bottom_frame.pack(fill=tk.X, expand=True)
-                
-                # Filename label
-                ttk.Label(
-                    bottom_frame,
-                    text=filename,
-                    width=50,
-                    anchor=tk.W
-                ).pack(side=tk.LEFT, padx=(0, 5))
-                
-                # Remove button
-                remove_btn = ttk.Button(
-                    bottom_frame,
-                    text="X",
-                    width=6,
-                    command=lambda f=file_path: self.remove_file(f)
-                )
-                remove_btn.pack(side=tk.RIGHT)
-            
-            # Update canvas scroll region
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            
-        except Exception as e:
-            # Create error label if preview fails
-            error_label = ttk.Label(
-                self.scrollable_frame,
-                text=f"Preview Error: {str(e)}",
-                foreground="red"
-            )
-            error_label.pack()
+        """Show the selected files in the file list"""
+        self.file_list.set_items(self.input_paths)
+    
+    def warm_probe_cache(self):
+        """Probe the selection in the background so a batch can be scheduled at once"""
+        if self.input_paths:
+            self.probe_executor.submit(probe_files, list(self.input_paths), self.ffmpeg_path)
     
     def remove_file(self, file_path):
         if file_path in self.input_paths:
@@ -448,18 +704,97 @@ class VideoConverter:
             self.path_var.set(path)
             self.status_var.set(f"Output path set to: {path}")
     
-    def get_format_extension(self, display_name):
-        """Get file extension from display name"""
-        for fmt in self.target_formats:
-            if fmt[0] == display_name:
-                return fmt[1]
-        return display_name.lower()
+    def choose_image(self):
+        """Pick the picture shown by videos rendered from audio files"""
+        path = filedialog.askopenfilename(
+            filetypes=[("Images", "*.png *.jpg *.jpeg *.bmp *.webp"), ("All files", "*.*")]
+        )
+        if path:
+            self.set_image(path)
+            self.background_var.set("Image")
+    
+    def set_image(self, path):
+        self.image_path = path
+        self.image_var.set(os.path.basename(path) if path else "Cover art")
+    
+    def get_target_formats(self):
+        """Get the file extensions of every checked target format"""
+        return [fmt[1] for fmt in self.target_formats if self.target_format_vars[fmt[1]].get()]
+    
+    def get_heights(self):
+        """Get every checked output height (None for the source size)"""
+        return [height for height in RENDITION_HEIGHTS if self.height_vars[height].get()]
+    
+    def get_settings(self):
+        """Current conversion settings, stored in the batch journal"""
+        return {
+            "source_format": self.source_format_var.get(),
+            "target_formats": self.get_target_formats(),
+            "heights": self.get_heights(),
+            "output_path": self.output_path,
+            "create_folder": self.create_folder_var.get(),
+            "folder_name": self.folder_var.get(),
+            "use_cache": self.use_cache_var.get(),
+            "preset": self.preset_var.get(),
+            "segment": self.segment_var.get(),
+            "background": self.background_var.get(),
+            "background_image": self.image_path,
+        }
+    
+    def apply_settings(self, settings):
+        """Restore the settings of a journaled batch"""
+        # Journals of earlier versions lack the newer settings, which then keep their defaults
+        source_format = settings.get("source_format", self.source_format_var.get())
+        if source_format == "AUDIO (Extract from Video)":
+            source_format = AUDIO_SOURCE  # Name used by earlier versions
+        self.source_format_var.set(source_format)
+        target_formats = settings.get("target_formats", self.get_target_formats())
+        for extension, var in self.target_format_vars.items():
+            var.set(extension in target_formats)
+        heights = settings.get("heights", [None])  # Only the source size before renditions
+        for height, var in self.height_vars.items():
+            var.set(height in heights)
+        self.output_path = settings.get("output_path", self.output_path)
+        self.path_var.set(self.output_path)
+        self.create_folder_var.set(settings.get("create_folder", self.create_folder_var.get()))
+        self.folder_var.set(settings.get("folder_name", self.folder_var.get()))
+        self.toggle_folder_entry()
+        self.use_cache_var.set(settings.get("use_cache", self.use_cache_var.get()))
+        self.preset_var.set(settings.get("preset", DEFAULT_PRESET))
+        self.segment_var.set(settings.get("segment", True))
+        self.background_var.set(settings.get("background", DEFAULT_BACKGROUND))
+        self.set_image(settings.get("background_image", ""))
+    
+    def resume_batch(self):
+        """Continue the last interrupted batch with its settings, skipping finished files"""
+        if self.scheduler:
+            return
+        journal = BatchJournal.latest("video")
+        if journal is None:
+            messagebox.showinfo("Resume", "There is no interrupted video batch to resume.")
+            return
+        
+        if not messagebox.askyesno(
+            "Resume",
+            f"Resume the batch of {len(journal.inputs)} files started {journal.started()}?\n\n"
+            f"{journal.completed_count()} files are already converted and will be skipped."
+        ):
+            return
+        
+        try:
+            self.apply_settings(journal.settings)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not restore the batch settings:\n{str(e)}")
+            return
+        self.input_paths = list(journal.inputs)
+        self.process_files()
+        self.convert_files(journal)
     
     def sanitize_filename(self, filename):
         """Remove invalid characters from filename"""
         return re.sub(r'[<>:"/\\|?*]', '', filename)
     
-    def convert_files(self):
+    def convert_files(self, journal=None):
         if not self.input_paths:
             messagebox.showerror("Error", "No files selected!")
             return
@@ -468,13 +803,18 @@ class VideoConverter:
             messagebox.showerror("Error", "Please select an output folder!")
             return
         
-        target_display = self.target_format_var.get()
-        if not target_display:
+        target_formats = self.get_target_formats()
+        if not target_formats:
             messagebox.showerror("Error", "Please select target format!")
             return
         
-        # Get actual file extension
-        target_format = self.get_format_extension(target_display)
+        heights = self.get_heights()
+        if not heights:
+            messagebox.showerror("Error", "Please select at least one size!")
+            return
+        target_display = ", ".join(fmt.upper() for fmt in target_formats)
+        if heights != [None]:
+            target_display += " at " + ", ".join(rendition_name(height) for height in heights)
         
         # Determine output directory
         if self.create_folder_var.get():
@@ -488,80 +828,270 @@ class VideoConverter:
             os.makedirs(output_dir)
             self.status_var.set(f"Created folder: {folder_name}")
         
-        # Convert files
-        success_count = 0
-        error_count = 0
-        total_files = len(self.input_paths)
-        ffmpeg_path = which("ffmpeg")
+        # Files converted earlier with the same settings are reused from the cache
+        use_cache = self.use_cache_var.get()
+        preset = self.preset_var.get()
+        segment = self.segment_var.get()
+        background = self.background_var.get()
+        image_path = self.image_path if background == "Image" else ""
+        audio_source = self.source_format_var.get() == AUDIO_SOURCE
+        
+        def cache_options(target_format, height):
+            if target_format in AUDIO_FORMATS:
+                return {"ffmpeg": AUDIO_OUTPUT_ARGS[target_format], "stream_copy": True}
+            if audio_source:
+                # Recordings are rendered over a picture; a changed image gives a different video
+                return {
+                    "ffmpeg": get_encoder_args(target_format, STILL_PRESET),
+                    "stream_copy": True,
+                    "height": height,
+                    "background": background,
+                    "image": file_signature(image_path) if image_path else None,
+                }
+            return {
+                "ffmpeg": get_encoder_args(target_format, preset),
+                "stream_copy": True,
+                "segment": segment,
+                "height": height,
+            }
         
-        for i, input_path in enumerate(self.input_paths):
-            # Sanitize filename and create output path
+        # The journal records finished files so an interrupted batch can be resumed
+        self.journal = journal or open_journal("video", self.get_settings(), self.input_paths)
+        self.batch = {
+            "total": len(self.input_paths),
+            "success": 0,
+            "errors": 0,
+            "cached": 0,
+            "copied": 0,
+            "transcoded": 0,
+            "remuxed": 0,
+            "segmented": 0,
+            "converted": 0,
+            "resumed": 0,
+            "finished": set(),
+            "target_display": target_display,
+            "output_dir": output_dir,
+            "files": {},
+            "outputs": {},
+        }
+        
+        to_convert = []
+        taken_names = set()
+        for input_path in self.input_paths:
+            # Sanitize filename; inputs with the same name from different folders
+            # are numbered, in input order so a resumed batch names them the same
             base_name = os.path.splitext(os.path.basename(input_path))[0]
-            clean_name = self.sanitize_filename(base_name)
-            output_file = os.path.join(output_dir, f"{clean_name}.{target_format}")
+            clean_name = unique_output_name(self.sanitize_filename(base_name), taken_names)
             
-            self.status_var.set(f"Converting {i+1}/{total_files}: {base_name}")
-            self.root.update()
+            # Files whose output was verified by the journal are not converted again
+            if self.journal and self.journal.is_complete(input_path):
+                self.batch["success"] += 1
+                self.batch["resumed"] += 1
+                continue
             
+            # One output path per format and size
+            renditions = []
+            for target_format in target_formats:
+                for height in heights:
+                    suffix = f"-{height}p" if height else ""
+                    output_file = os.path.join(output_dir, f"{clean_name}{suffix}.{target_format}")
+                    renditions.append((target_format, height, output_file))
+            self.batch["files"][input_path] = [output_file for fmt, height, output_file in renditions]
+            self.batch["outputs"][input_path] = renditions
+            to_convert.append(input_path)
+        
+        if not to_convert:
+            self.finish_conversion()
+            return
+        
+        def run_job(input_path, threads):
+            # Hashing for the cache key reads the whole input, so it runs here and not on the Tk thread
+            cache = open_cache() if use_cache else None
             try:
-                if target_format in ["mp3", "wav", "aac", "m4a", "ogg", "wma", "flac"]:
-                    # Extract audio from video
-                    audio = AudioSegment.from_file(input_path)
-                    
-                    # Handle special formats
-                    if target_format == "aac":
-                        audio.export(output_file, format="adts", codec="aac")
-                    elif target_format == "m4a":
-                        audio.export(output_file, format="ipod", codec="aac")
-                    elif target_format == "wma":
-                        audio.export(output_file, format="asf", codec="wmav2")
-                    elif target_format == "flac":
-                        audio.export(output_file, format="flac", codec="flac", 
-                                    parameters=["-compression_level", "8"])
-                    else:
-                        audio.export(output_file, format=target_format)
-                else:
-                    # Video-to-video conversion
-                    command = [
-                        ffmpeg_path,
-                        "-i", input_path,
-                        "-y",  # Overwrite without asking
-                        output_file
-                    ]
-                    
-                    # Run FFmpeg command
-                    subprocess.run(
-                        command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        check=True,
-                        text=True
-                    )
-                
-                success_count += 1
+                methods = {}
+                missing = []
+                cache_keys = {}
+                for target_format, height, output_file in self.batch["outputs"][input_path]:
+                    if cache:
+                        key = cache.make_key(input_path, target_format, cache_options(target_format, height))
+                        cache_keys[output_file] = key
+                        if cache.fetch(key, output_file):
+                            methods[output_file] = "cached"
+                            continue
+                    missing.append((target_format, height, output_file))
                 
-            except Exception as e:
-                error_count += 1
-                self.status_var.set(f"Error converting {base_name}: {str(e)}")
-                # Log detailed error
-                with open("conversion_errors.log", "a") as log_file:
-                    log_file.write(f"Error converting {input_path} to {target_format}: {str(e)}\n")
+                # Only the renditions that were not cached are converted
+                if missing:
+                    methods.update(convert_missing(input_path, missing, threads))
+                    if cache:
+                        for target_format, height, output_file in missing:
+                            store_in_cache(cache, cache_keys[output_file], output_file)
+                return methods
+            finally:
+                if cache:
+                    cache.close()
+        
+        def convert_missing(input_path, missing, threads):
+            methods = {}
+            audio_outputs = [(fmt, output_file) for fmt, height, output_file in missing if fmt in AUDIO_FORMATS]
+            if audio_outputs:
+                # Extract audio from video, copying the stream when the codec fits
+                audio_methods = convert_audio_outputs(
+                    input_path, audio_outputs, ffmpeg_path=self.ffmpeg_path, threads=threads
+                )
+                methods.update({output_file: audio_methods[fmt] for fmt, output_file in audio_outputs})
+            
+            def on_progress(progress):
+                # Runs on the worker thread; show_progress reads it on the Tk thread
+                self.progress[input_path] = progress
+            
+            renditions = [(height, output_file) for fmt, height, output_file in missing if fmt not in AUDIO_FORMATS]
+            if not renditions:
+                return methods
+            
+            try:
+                info = probe_file(input_path, self.ffmpeg_path)
+            except Exception:
+                info = None  # Let the conversion report the real problem
+            if info and is_audio_only(info):
+                # Recordings get a still picture instead of a full-rate video encode
+                methods.update(render_audio_renditions(
+                    input_path, info, renditions, background, image_path, self.ffmpeg_path, threads, on_progress
+                ))
+            else:
+                methods.update(convert_video_renditions(
+                    input_path, renditions, self.ffmpeg_path, threads, on_progress, preset=preset, segment=segment
+                ))
+            return methods
+        
+        self.scheduler = JobScheduler(
+            self.root, run_job, self.on_job_result, self.finish_conversion,
+            max_jobs=video_job_count(), ffmpeg_path=self.ffmpeg_path
+        )
+        self.progress = {}
+        self.progress_bar.config(value=0)
+        self.progress_var.set("")
+        self.convert_btn.config(state="disabled")
+        self.status_var.set(f"Reading durations of {len(to_convert)} files...")
+        self.scheduler.start(to_convert)
+        self.root.after(500, self.show_progress)
+    
+    def show_progress(self):
+        """Show encode fps, speed and the batch ETA from the running ffmpeg processes"""
+        scheduler = self.scheduler
+        if scheduler is None:
+            return  # Batch finished
+        try:
+            if not self.root.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self.root.after(500, self.show_progress)
+        if scheduler.probing is not None:
+            return  # Durations are not known yet
+        
+        # Seconds of video done against the total; files of unknown length are left out
+        batch = self.batch
+        total_seconds = 0.0
+        done_seconds = 0.0
+        speed = 0.0
+        running = []
+        for path, duration in scheduler.durations.items():
+            progress = self.progress.get(path)
+            if path in batch["finished"]:
+                done_seconds += duration or 0
+            elif progress is not None:
+                done_seconds += min(progress["time"] or 0, duration or 0)
+                speed += progress["speed"] or 0
+                running.append((path, duration, progress))
+            total_seconds += duration or 0
+        
+        files_done = len(batch["finished"])
+        if total_seconds:
+            self.progress_bar.config(value=100 * done_seconds / total_seconds)
+        elif scheduler.total:
+            self.progress_bar.config(value=100 * files_done / scheduler.total)
+        
+        # Speed is seconds of video per second, so the ETA is what is left divided by it
+        text = f"{files_done}/{scheduler.total} files"
+        if total_seconds and speed:
+            text += f", {speed:.1f}x realtime, ETA {format_duration((total_seconds - done_seconds) / speed)}"
+        
+        # Per-file progress, e.g. "clip.mp4 45% 120 fps 4.1x"
+        details = []
+        for path, duration, progress in running:
+            detail = os.path.basename(path)
+            if duration and progress["time"] is not None:
+                detail += f" {min(100, 100 * progress['time'] / duration):.0f}%"
+            if progress["fps"] is not None:
+                detail += f" {progress['fps']:.0f} fps"
+            if progress["speed"] is not None:
+                detail += f" {progress['speed']:.1f}x"
+            details.append(detail)
+        if details:
+            text += " - " + " | ".join(details)
+        self.progress_var.set(text)
+    
+    def on_job_result(self, input_path, methods, error):
+        """Record one finished file and show it in the status bar"""
+        batch = self.batch
+        base_name = os.path.splitext(os.path.basename(input_path))[0]
+        batch["finished"].add(input_path)
+        self.progress.pop(input_path, None)
+        if error is not None:
+            batch["errors"] += 1
+            self.status_var.set(f"Error converting {base_name}: {str(error)}")
+            # Log detailed error
+            with open("conversion_errors.log", "a") as log_file:
+                log_file.write(f"Error converting {input_path} to {batch['target_display']}: {str(error)}\n")
+            if self.journal:
+                self.journal.mark_failed(input_path, error)
+            return
+        
+        batch["success"] += 1
+        for fmt, height, output_file in batch["outputs"][input_path]:
+            batch[methods[output_file]] += 1
+        if self.journal:
+            self.journal.mark_done(input_path, batch["files"][input_path])
+        
+        # e.g. "clip.mp4 remuxed, clip-720p.webm converted"
+        done = batch["success"] + batch["errors"]
+        running = self.scheduler.running() if self.scheduler else 0
+        summary = ", ".join(f"{os.path.basename(output_file)} {method}" for output_file, method in methods.items())
+        self.status_var.set(f"Done {done}/{batch['total']}: {summary} ({running} running)")
+    
+    def finish_conversion(self):
+        """Show the batch summary"""
+        batch = self.batch
+        self.scheduler = None
+        # Keep the journal of a batch with errors so Resume retries just the failed files
+        if self.journal and not batch["errors"]:
+            self.journal.finish()
+        self.journal = None
+        self.progress_bar.config(value=100)
+        self.progress_var.set("")
+        self.convert_btn.config(state="normal" if self.input_paths else "disabled")
         
         # Show summary
         source_type = self.source_format_var.get()
-        if source_type == "AUDIO (Extract from Video)":
-            message_text = f"Processed {total_files} video files (audio extracted)\n\n"
+        if source_type == AUDIO_SOURCE:
+            message_text = f"Processed {batch['total']} audio files (rendered as video)\n\n"
         else:
-            message_text = f"Processed {total_files} video files\n\n"
+            message_text = f"Processed {batch['total']} video files\n\n"
             
         messagebox.showinfo(
             "Conversion Complete", 
             message_text +
-            f"Success: {success_count}\n"
-            f"Errors: {error_count}\n\n"
-            f"Files saved to: {output_dir}\n\n"
+            f"Success: {batch['success']}\n"
+            f"Errors: {batch['errors']}\n"
+            f"Output files with audio stream copied: {batch['copied']}\n"
+            f"Output files remuxed without re-encoding: {batch['remuxed']}\n"
+            f"Output files encoded in parallel segments: {batch['segmented']}\n"
+            f"Output files reused from cache: {batch['cached']}\n"
+            f"Already converted before resuming: {batch['resumed']}\n\n"
+            f"Files saved to: {batch['output_dir']}\n\n"
             "You can convert the same files again or remove them individually."
         )
         
         # Update status
-        self.status_var.set(f"Converted {success_count} files to {target_display}")
\ No newline at end of file
+        self.status_var.set(f"Converted {batch['success']} files to {batch['target_display']}")
\ No newline at end of file
@@ -0,0 +1,119 @@
+import glob
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ffmpeg_tools import run_ffmpeg
+
+# Shorter files are encoded by one process; splitting costs an extra pass over the file
+SEGMENT_MIN_DURATION = 600
+
+# A few segments per worker, so one slow segment does not leave the others idle at the end
+SEGMENTS_PER_WORKER = 4
+MIN_SEGMENT_SECONDS = 20
+
+
+def segment_length(duration, workers):
+    """Target length of each segment in seconds"""
+    return max(MIN_SEGMENT_SECONDS, duration / (workers * SEGMENTS_PER_WORKER))
+
+
+def split_at_keyframes(input_path, folder, seconds, video_map="0:v:0", ffmpeg_path=None):
+    """Copy the video stream into pieces of about seconds each, cut at keyframes
+
+    The segment muxer only cuts on keyframes, so every piece decodes on its
+    own. Returns the piece paths in order.
+    """
+    run_ffmpeg(
+        ["-i", input_path, "-map", video_map, "-c", "copy", "-f", "segment",
+         "-segment_time", f"{seconds:.3f}", "-reset_timestamps", "1",
+         os.path.join(folder, "source-%05d.nut")],
+        ffmpeg_path
+    )
+    return sorted(glob.glob(os.path.join(folder, "source-*.nut")))
+
+
+def combine_progress(progresses):
+    """Add up the progress of segments that encode at the same time
+
+    Finished segments count towards the time and frames written, but not
+    towards the current fps and speed.
+    """
+    combined = {"time": 0.0, "frame": 0, "fps": 0.0, "speed": 0.0, "done": False}
+    for progress in progresses:
+        keys = ("time", "frame") if progress["done"] else ("time", "frame", "fps", "speed")
+        for key in keys:
+            combined[key] += progress[key] or 0
+    return combined
+
+
+def encode_segments(pieces, encoder_args, workers, ffmpeg_path=None, on_progress=None):
+    """Encode every piece on its own single-threaded ffmpeg process, workers at a time
+
+    Returns the encoded segment paths in order.
+    """
+    outputs = [piece.replace("source-", "encoded-") for piece in pieces]
+    progress = {}
+    lock = threading.Lock()
+
+    def encode(index):
+        def report(segment_progress):
+            # Called from several worker threads; report the sum of all segments
+            with lock:
+                progress[index] = segment_progress
+                combined = combine_progress(progress.values())
+            on_progress(combined)
+
+        run_ffmpeg(
+            ["-i", pieces[index]] + encoder_args + [outputs[index]],
+            ffmpeg_path, threads=1, on_progress=report if on_progress else None
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(encode, index) for index in range(len(pieces))]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return outputs
+
+
+def join_segments(segments, input_path, output_file, folder, ffmpeg_path=None):
+    """Join encoded segments with the concat demuxer and add the source audio
+
+    The video is copied, not re-encoded. The audio is encoded once for the
+    whole file, so there are no gaps at the segment boundaries.
+    """
+    list_path = os.path.join(folder, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for segment in segments:
+            escaped = segment.replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    run_ffmpeg(
+        ["-f", "concat", "-safe", "0", "-i", list_path, "-i", input_path,
+         "-map", "0:v", "-map", "1:a:0?", "-c:v", "copy", output_file],
+        ffmpeg_path
+    )
+
+
+def encode_segmented(input_path, output_file, encoder_args, duration, workers, video_map="0:v:0",
+                     ffmpeg_path=None, on_progress=None):
+    """Encode one long video as keyframe-aligned segments on several processes
+
+    Encoders such as VP9 and MPEG-2 stop scaling long before they use
+    every core. Here the source is split at keyframes without decoding, the
+    pieces are encoded concurrently by single-threaded ffmpeg processes and
+    the results are joined by the concat demuxer without re-encoding.
+    encoder_args are the video encoder options (audio is handled when
+    joining). on_progress gets the summed progress of the running segments.
+    The pieces are kept in a temporary folder next to output_file.
+    """
+    folder = os.path.dirname(os.path.abspath(output_file))
+    with tempfile.TemporaryDirectory(prefix="segments-", dir=folder) as temp_folder:
+        pieces = split_at_keyframes(input_path, temp_folder, segment_length(duration, workers), video_map, ffmpeg_path)
+        segments = encode_segments(pieces, encoder_args, workers, ffmpeg_path, on_progress)
+        join_segments(segments, input_path, output_file, temp_folder, ffmpeg_path)